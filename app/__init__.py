@@ -1,47 +1,122 @@
 #!/usr/bin/env python
+import os
 from flask import Flask
-from flask_sqlalchemy import SQLAlchemy
 # from flask_login import LoginManager
 from flask_jwt_extended import JWTManager
 from flask_marshmallow import Marshmallow
 from flask_mail import Mail
-from flask_cors import CORS
+from flask_migrate import Migrate
+from app.utils.routing import RoutingSQLAlchemy
+from app.utils.metrics import Metrics, timed_schema
+from app.utils.profiler import Profiler
+from app.utils.compress import Compress
+from app.utils.cors import BlueprintCORS
 
 
-# Initialize app
-app = Flask(
-    __name__,
-    template_folder='../../client/build',
-    static_folder='../../client/build/static')
+# Directory of the alembic migrations
+MIGRATIONS_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'migrations')
 
-app.config.from_object('config')
+# Create the extensions unbound, create_app binds them to an app
 
-# Initialize Flask_SQLAlchemy
-db = SQLAlchemy(app)
+# Flask_SQLAlchemy with the configured connection pool and read replicas
+db = RoutingSQLAlchemy()
 
-# Initialize Flask-Cors
-CORS(app, resources={
-    r"/*": {
-        "origins": "*",
-        "expose_headers": ["access", "refresh"]
-    }
-}, supports_credentials=True)
+# Flask-Migrate
+migrate = Migrate()
 
-# Initialize Flask-JWT-Extended
-jwt = JWTManager(app)
+# Flask-Cors policies per blueprint, with cached preflights
+cors = BlueprintCORS()
 
-# Initialize Flask-Marshmallow
-ma = Marshmallow(app)
+# Flask-JWT-Extended
+jwt = JWTManager()
 
-# Initialize Flask-Mail
-mail = Mail(app)
+# Flask-Marshmallow, whose model schemas time their dumps for the
+# request metrics
+ma = Marshmallow()
+ma.ModelSchema = timed_schema(ma.ModelSchema)
 
-# Import blueprints
-from app.auth import auth as auth_blueprint  # noqa
-from app.api import api as api_blueprint  # noqa
-from app.mail import mail as mail_blueprint  # noqa
+# Flask-Mail
+mailer = Mail()
 
-# Register the blueprints
-app.register_blueprint(auth_blueprint)
-app.register_blueprint(api_blueprint, url_prefix="/api/v1")
-app.register_blueprint(mail_blueprint, url_prefix="/api/v1")
+# Request metrics, recorded if METRICS_ENABLED is set
+metrics = Metrics()
+
+# On-demand request profiler
+profiler = Profiler()
+
+# Brotli/gzip response compression
+compress = Compress()
+
+
+def create_app(config='config', **settings):
+    '''Creates an app from a config object or import path, with
+    settings overriding the config
+
+    Arg {string|Object} config
+        {Object} **settings
+
+    Returns {Flask} app
+    '''
+    # Initialize app
+    app = Flask(
+        __name__,
+        template_folder='../../client/build',
+        static_folder='../../client/build/static')
+
+    app.config.from_object(config)
+    app.config.update(settings)
+
+    # Encode json responses with orjson if it is installed
+    from app.utils.encoders import init_json  # noqa
+    init_json(app)
+
+    # Bind the extensions to the app
+    db.init_app(app)
+    migrate.init_app(app, db, directory=MIGRATIONS_DIR)
+    cors.init_app(app)
+    jwt.init_app(app)
+    ma.init_app(app)
+    mailer.init_app(app)
+    metrics.init_app(app)
+    profiler.init_app(app)
+    compress.init_app(app)
+
+    # Import blueprints here so importing the package stays cheap
+    from app.auth import auth as auth_blueprint  # noqa
+    from app.api import api as api_blueprint  # noqa
+    from app.mail import mail as mail_blueprint  # noqa
+
+    # Register the blueprints
+    app.register_blueprint(auth_blueprint)
+    app.register_blueprint(api_blueprint, url_prefix="/api/v1")
+    app.register_blueprint(mail_blueprint, url_prefix="/api/v1")
+
+    # Tell every worker's caches which tables a commit wrote to
+    from app.utils.bus import init_bus  # noqa
+    from app.utils.search import init_search  # noqa
+    init_bus(app)
+    init_search(app)
+
+    # Cache the team, role and topic tables in process
+    from app.utils.refdata import init_refdata  # noqa
+    init_refdata(app)
+
+    # Load the tournament state on warm up, and recompute it after
+    # the teams or matches change
+    from app.utils.tournament import init_tournament  # noqa
+    init_tournament(app)
+
+    return app
+
+
+def __getattr__(name):
+    '''Creates the default app on first access of app.app, so existing
+    `from app import app` entry points keep working'''
+    if name == 'app':
+        global app
+        app = create_app()
+        return app
+
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
@@ -1,4 +1,5 @@
 from flask import Blueprint
+from app.utils.lazy import LazyView
 
 
 # Setup api blueprint
@@ -6,4 +7,9 @@ api = Blueprint('api', __name__)
 
 # Import blueprint views
 from .views import (users, login, projects, teams, brackets, matches,  #noqa
-    topics)  # noqa
+    topics, tournament, health, search, profiles, live, batch)  # noqa
+
+# The OAuth view is only imported when first used
+api.add_url_rule(
+    '/oauth/<provider>', 'oauth',
+    LazyView('app.api.views.oauth.oauth'), methods=['POST'])
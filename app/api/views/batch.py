@@ -0,0 +1,60 @@
+from flask import request, jsonify, current_app
+from app.api import api
+from app.utils.batch import run_batch, BatchError
+
+
+@api.route('/batch', methods=['POST'])
+def batch():
+    """
+    This route runs a list of API requests in one round trip and
+    returns all of their responses. The requests run in order with the
+    batch request's credentials, share one database session and decode
+    the user's token once. Cookies set by any of them, like the login
+    cookies, are set on the batch response.
+
+    Body {Object<json>}
+            requests: {Array<Object<json>>} method, path, body
+
+    Returns {Object<json>} 200
+            num_results: {string}
+            success: {string}
+            responses: {Array<Object<json>>} status, headers, body
+
+    Throws {Exception{Object<json>}}
+            error: MissingRequests 400
+                   TooManyRequests 400
+                   InvalidRequest 400
+    """
+    # Get the sub-requests from the request
+    data = request.get_json(silent=True)
+    sub_requests = data.get('requests') if isinstance(data, dict) else None
+
+    # If no requests were sent, return error
+    if not isinstance(sub_requests, list) or not sub_requests:
+        return jsonify({'error': 'Missing requests!'}), 400
+
+    # If too many requests were sent, return error
+    limit = current_app.config.get('BATCH_MAX_REQUESTS', 20)
+    if len(sub_requests) > limit:
+        return jsonify({
+            'error': 'A batch can have at most %d requests!' % limit
+        }), 400
+
+    # Try to run the requests
+    try:
+        responses, cookies = run_batch(sub_requests)
+
+    # If a request is invalid, return error
+    except BatchError as e:
+        return jsonify({'error': str(e)}), 400
+
+    # Create json response with the cookies of every request
+    response = jsonify({
+        'num_results': str(len(responses)),
+        'success': 'Successfully ran batch!',
+        'responses': responses,
+    })
+    for cookie in cookies:
+        response.headers.add('Set-Cookie', cookie)
+
+    return response, 200
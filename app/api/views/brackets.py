@@ -1,12 +1,14 @@
-from app import app, db
-from flask import request, jsonify, make_response
+from app import db
+from flask import request, make_response
 from app.models import Bracket, BracketSchema, User, UserSchema
 from flask_jwt_extended import (
     jwt_required, jwt_optional, get_jwt_identity
 )
+from sqlalchemy.orm import joinedload
 from sqlalchemy.orm.exc import NoResultFound
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from app.api import api
+from app.utils.formats import jsonify
 from datetime import timedelta, datetime
 
 
@@ -25,8 +27,9 @@ def get_all_brackets():
             error: NoResultFound 404
                    SQLAlchemyError 400
     """
-    # Try to get all brackets from database
-    query = Bracket.query
+    # Try to get all brackets from database, joining their users so
+    # serializing doesn't query once per bracket
+    query = Bracket.query.options(joinedload(Bracket.user))
 
     try:
         brackets = query.all()
@@ -74,7 +77,7 @@ def get_one_bracket(id):
                    NotAuthorized 401
     """
     # Try to get bracket from database
-    query = Bracket.query.filter_by(id=id)
+    query = Bracket.query.options(joinedload(Bracket.user)).filter_by(id=id)
 
     try:
         bracket = query.one()
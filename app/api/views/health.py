@@ -0,0 +1,41 @@
+from app import db
+from flask import jsonify, current_app
+from sqlalchemy.exc import SQLAlchemyError
+from app.api import api
+from app.utils.pool import get_pool_stats
+from app.utils.routing import use_primary
+
+
+@api.route('/health', methods=['GET'])
+def health():
+    """
+    This route checks that the database can be reached and returns
+    the connection pool stats as a json object.
+
+    Returns {Object<json>} 200
+            success: {string}
+            pool: {Object<json>}
+            replicas: {Object<json>}
+
+    Throws {Exception{Object<json>}}
+            error: SQLAlchemyError 503
+    """
+    # Check the primary, the replicas are checked by the replica set
+    use_primary()
+
+    # Try to run a trivial query on the database
+    try:
+        db.session.execute('SELECT 1')
+
+    # If the database can't be reached, return error
+    except SQLAlchemyError:
+        return jsonify({
+            'error': 'Database unavailable!',
+            'pool': get_pool_stats(db.engine),
+        }), 503
+
+    return jsonify({
+        'success': 'Database is available.',
+        'pool': get_pool_stats(db.engine),
+        'replicas': current_app.extensions['replicas'].status(),
+    }), 200
@@ -0,0 +1,41 @@
+from app import db
+from flask import Response, stream_with_context, current_app
+from app.api import api
+from app.utils.live import match_scores, sse_event, SSE_KEEPALIVE
+from time import sleep, time
+
+
+@api.route('/live', methods=['GET'])
+def live():
+    """
+    This route streams the match scores as server-sent events. The
+    scores are sent when the stream opens and whenever they change.
+    The stream closes after LIVE_MAX_SECONDS so it doesn't hold a
+    worker thread forever; clients reconnect automatically.
+
+    Returns {text/event-stream} 200
+            scores: {Array<Object<json>>}
+    """
+    interval = current_app.config.get('LIVE_POLL_INTERVAL', 2)
+    max_seconds = current_app.config.get('LIVE_MAX_SECONDS', 300)
+
+    def stream():
+        last = None
+        end = time() + max_seconds
+        while time() < end:
+            scores = match_scores()
+            db.session.rollback()
+
+            # Only send the scores if they changed
+            if scores != last:
+                last = scores
+                yield sse_event(scores)
+            else:
+                yield SSE_KEEPALIVE
+
+            sleep(interval)
+
+    return Response(
+        stream_with_context(stream()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache'})
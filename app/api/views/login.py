@@ -5,13 +5,11 @@ from flask_jwt_extended import (
     get_jwt_identity, get_csrf_token
 )
 from app.api import api
-from app.models import User, UserSchema, OAuth
+from app.models import User, UserSchema
 from werkzeug.security import check_password_hash
-from datetime import datetime, timedelta
+from datetime import timedelta
 from sqlalchemy.orm.exc import NoResultFound
-from sqlalchemy.exc import SQLAlchemyError, IntegrityError
-from app import app, db
-import json
+from sqlalchemy.exc import SQLAlchemyError
 
 
 @api.route('/login')
@@ -170,141 +168,6 @@ def login():
         return response
 
 
-@api.route('/oauth/<provider>', methods=['POST'])
-def oauth(provider):
-    """
-    This route authenticates the user by receiving a provider
-    and oauth token and verifying a user exists. When a user logs
-    in new jwt tokens cookies will be set in the response.
-
-    Args {string} provider - facebook or google
-
-    Returns {Object<json>} 200
-            success: {string}
-            user: {Object<json>}
-
-    Throws {Exception{Object<json}}:
-            error: Authorization 401
-                   NoResultFound 401
-                   SQLAlchemyError 400
-                   MissingUser 400
-                   InactiveUser 400
-    """
-    # If no authorization header, return error
-    if not request.headers.get('Authorization'):
-        return jsonify({'error': 'Not a valid request'}), 401
-
-    # Get the token from authorization header and convert to dictionary
-    token = request.headers.get('Authorization').split('Bearer ')[1]
-    token = json.loads(token)
-
-    # Try to find oauth user in database
-    query = OAuth.query.filter_by(
-        provider=provider,
-        provider_uid=token['userID'],
-    )
-
-    try:
-        oauth = query.first()
-
-    # If no result found, return error
-    except NoResultFound:
-        return jsonify({
-            'error': "The user doesn't exist. Sign up to create an account"
-        }), 404
-
-    # If some other sqlalchemy error is thrown, return error
-    except SQLAlchemyError:
-        return jsonify({'error': 'Some problem occurred!'}), 400
-
-    # If not oauth create a new user
-    if not oauth:
-
-        # Get user data from request
-        data = request.get_json()
-
-        # If name or email is missing, return error
-        if not (data['name'] or not data['email'] or not data['picture']
-        or not data['provider_user_id']):
-            return make_response(jsonify({'error': 'Missing data!'}), 400)
-
-        # Create user object
-        user = User(
-            name=data['name'],
-            email=data['email'],
-            picture=data['picture'],
-            created_at=datetime.utcnow())
-
-        user.generate_public_id()
-
-        # Try to add user to database
-        try:
-            db.session.add(user)
-            db.session.commit()
-
-        # If username already in database, return error
-        except IntegrityError:
-            return jsonify({
-                'error': 'User with name or email already exists'
-            }), 400
-
-        # If some other sqlalchemy error is thrown, return error
-        except SQLAlchemyError:
-            return jsonify({'error': 'Some problem occurred!'}), 400
-
-        # Create new oauth token account for user
-        oauth = OAuth(
-            provider=provider,
-            provider_uid=data['provider_user_id'],
-            token=token,
-        )
-
-        # Associate the new local user account with the OAuth token
-        oauth.user = user
-
-        # Save and commit database models
-        db.session.add(oauth)
-        db.session.commit()
-
-    # If there is no user relation, return error
-    if not oauth.user:
-        return jsonify({'error': 'Some problem occurred!'}), 400
-
-    user = oauth.user
-
-    # Serialze the user object
-    user_schema = UserSchema()
-    output = user_schema.dump(user).data
-
-    # Create the tokens to be sent to the user
-    expires = timedelta(seconds=1800)
-    access_token = create_access_token(
-        identity=user.public_id,
-        expires_delta=expires
-    )
-    refresh_token = create_refresh_token(identity=user.public_id)
-
-    # Get the csrf tokens so they can be set as headers in response
-    csrf_access_token = get_csrf_token(access_token)
-    csrf_refresh_token = get_csrf_token(refresh_token)
-
-    # Create json response
-    response = make_response(
-        jsonify({
-            'user': output,
-            'success': 'Login successful!'
-        }), 200)
-
-    # Set JWT cookies and headers and return response
-    set_access_cookies(response, access_token)
-    set_refresh_cookies(response, refresh_token)
-    response.set_cookie('public_id', user.public_id)
-    response.headers['access'] = csrf_access_token
-    response.headers['refresh'] = csrf_refresh_token
-
-    return response
-
-
 @api.route('/logout', methods=['GET'])
 def logout():
     """
@@ -1,13 +1,17 @@
-from app import app, db
-from flask import request, jsonify, make_response
-from app.models import Match, MatchSchema, User, Team, TeamSchema
+from app import db
+from flask import request, make_response
+from app.models import (Match, MatchSchema, MatchTeamsSchema, User, Team,
+    TeamSchema)
 from flask_jwt_extended import (
     jwt_required, jwt_optional, get_jwt_identity
 )
+from sqlalchemy.orm import joinedload
 from sqlalchemy.orm.exc import NoResultFound
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from app.api import api
+from app.utils.formats import jsonify
 from datetime import timedelta, datetime
+from app.utils.refdata import missing_ids
 from .utils import roles_required
 
 
@@ -15,7 +19,8 @@ from .utils import roles_required
 def get_all_matches():
     """
     This route gets all matches from the database and returns
-    the array as a json object.
+    the array as a json object. If the embed=teams query parameter
+    is sent, each match includes a summary of both teams.
 
     Returns {Object<json>} 200
             num_results: {string}
@@ -26,7 +31,8 @@ def get_all_matches():
             error: NoResultFound 404
                    SQLAlchemyError 400
     """
-    # Try to get all matches from database
+    # Try to get all matches from database, the teams are serialized
+    # from the cached reference data
     query = Match.query
 
     try:
@@ -44,8 +50,11 @@ def get_all_matches():
     except SQLAlchemyError:
         return jsonify({'error': 'Some problem occurred!'}), 400
 
-    # Serialize array of matches
-    match_schema = MatchSchema(many=True)
+    # Serialize array of matches, embedding the teams if requested
+    if request.args.get('embed') == 'teams':
+        match_schema = MatchTeamsSchema(many=True)
+    else:
+        match_schema = MatchSchema(many=True)
     output = match_schema.dump(matches).data
 
     # Return json response
@@ -62,7 +71,8 @@ def get_all_matches():
 def get_one_match(id):
     """
     This route gets a single match from the database
-    and returns it as a json object.
+    and returns it as a json object. If the embed=teams query
+    parameter is sent, the match includes a summary of both teams.
 
     Args {string} id
 
@@ -90,7 +100,10 @@ def get_one_match(id):
         return jsonify({'error': 'Some problem occurred!'}), 400
 
     # Serialze the match object and return json response
-    match_schema = MatchSchema()
+    if request.args.get('embed') == 'teams':
+        match_schema = MatchTeamsSchema()
+    else:
+        match_schema = MatchSchema()
     output = match_schema.dump(match).data
 
     return jsonify({
@@ -148,6 +161,11 @@ def create_match():
     if not any(key in data for key in match_columns):
         return make_response(jsonify({'error': 'Missing data!'}), 400)
 
+    # Verify that both teams exist
+    if missing_ids('team', [
+            data[key] for key in ('team1_id', 'team2_id') if data.get(key)]):
+        return jsonify({'error': 'Team not found!'}), 400
+
     # Create match object
     match = Match(
         match=data['Match'],
@@ -240,6 +258,11 @@ def edit_match(id):
     # Get the match data from the request
     data = request.get_json()
 
+    # Verify that the sent teams exist
+    if missing_ids('team', [
+            data[key] for key in ('team1_id', 'team2_id') if data.get(key)]):
+        return jsonify({'error': 'Team not found!'}), 400
+
     # Update match data if it was sent and save in database
     if 'match' in data:
         match.match = data['match']
@@ -267,11 +290,12 @@ def edit_match(id):
 
     db.session.commit()
 
-    # Try to get team1 from the database
-    query = Team.query.filter_by(id=match.team1_id)
+    # Try to reload the updated match joined with both teams
+    query = Match.query.options(
+        joinedload(Match.team1), joinedload(Match.team2)).filter_by(id=id)
 
     try:
-        team1 = query.one()
+        match = query.one()
 
     # If no result found, return error
     except NoResultFound:
@@ -281,20 +305,13 @@ def edit_match(id):
     except SQLAlchemyError:
         return jsonify({'error': 'Some problem occurred!'}), 400
 
-    # Try to get team2 from the database
-    query = Team.query.filter_by(id=match.team2_id)
-
-    try:
-        team2 = query.one()
+    team1 = match.team1
+    team2 = match.team2
 
-    # If no result found, return error
-    except NoResultFound:
+    # If either team doesn't exist, return error
+    if not team1 or not team2:
         return jsonify({'error': 'No result found!'}), 404
 
-    # If some other sqlalchemy error is thrown, return error
-    except SQLAlchemyError:
-        return jsonify({'error': 'Some problem occurred!'}), 400
-
     # if 'team1_score' in data:
     #     team1_score = int(data['team1_score'])
     #     team1.GF += team1_score
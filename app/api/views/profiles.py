@@ -0,0 +1,94 @@
+from app import profiler
+from flask import (
+    request, jsonify, make_response, send_from_directory, current_app)
+from flask_jwt_extended import jwt_required
+from app.api import api
+from app.utils.profiler import MODES
+from .utils import roles_required
+import re
+
+
+# Profile ids are a timestamp and a random hex suffix
+PROFILE_ID_RE = re.compile(r'^\d{14}-[0-9a-f]{8}$')
+
+# Extensions a profile can be downloaded as
+EXTENSIONS = ('pstats', 'collapsed', 'json')
+
+
+@api.route('/profiler/arm', methods=['POST'])
+@jwt_required
+@roles_required('admin')
+def arm_profiler():
+    """
+    This route arms the profiler for the next requests to an endpoint
+    handled by this worker and returns a success message as a json object.
+
+    Returns {Object<json>} 200
+            success: {string}
+
+    Throws {Exception{Object<json>}}
+            error: MissingData 400
+                   NotAuthorized 401
+    """
+    # Get the endpoint, count and mode from the request
+    data = request.get_json()
+    if not data or data.get('endpoint') not in current_app.view_functions:
+        return make_response(jsonify({'error': 'Missing data!'}), 400)
+
+    count = int(data.get('count', 1))
+    mode = data.get('mode', 'cprofile')
+    if mode not in MODES:
+        return make_response(jsonify({'error': 'Invalid mode!'}), 400)
+
+    profiler.arm(data['endpoint'], count, mode)
+
+    return jsonify({
+        'success': 'Profiling the next %d requests to %s.' % (
+            count, data['endpoint'])
+    }), 200
+
+
+@api.route('/profiler/profiles', methods=['GET'])
+@jwt_required
+@roles_required('admin')
+def get_all_profiles():
+    """
+    This route gets the metadata of all stored profiles and returns
+    the array as a json object.
+
+    Returns {Object<json>} 200
+            num_results: {string}
+            success: {string}
+            profiles: {Object<json>}
+    """
+    profiles = profiler.list_profiles()
+
+    return jsonify({
+        'num_results': str(len(profiles)),
+        'success': 'Successfully retrieved profiles!',
+        'profiles': profiles,
+    }), 200
+
+
+@api.route('/profiler/profiles/<id>.<ext>', methods=['GET'])
+@jwt_required
+@roles_required('admin')
+def get_one_profile(id, ext):
+    """
+    This route downloads a stored profile as a .pstats file, a
+    collapsed stack file or its json metadata with the SQL statements.
+
+    Args {string} id
+         {string} ext - pstats, collapsed or json
+
+    Returns {file} profile 200
+
+    Throws {Exception{Object<json>}}
+            error: NotFound 404
+    """
+    # If the id or extension is invalid, return error
+    if not PROFILE_ID_RE.match(id) or ext not in EXTENSIONS:
+        return jsonify({'error': 'No result found!'}), 404
+
+    return send_from_directory(
+        profiler.directory, '%s.%s' % (id, ext), as_attachment=True)
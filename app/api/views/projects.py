@@ -1,14 +1,22 @@
-from app import app, db
-from flask import request, jsonify, make_response
-from app.models import Project, ProjectSchema, ProjectTopics, User
+from app import db
+from flask import request, make_response, current_app
+import gzip
+from app.models import Project, ProjectSchema, ProjectTopics, Topic, User
+from sqlalchemy import func
 from flask_jwt_extended import (
     jwt_required, jwt_optional, get_jwt_identity
 )
+from sqlalchemy.orm import selectinload, load_only, undefer_group
 from sqlalchemy.orm.exc import NoResultFound
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from app.api import api
+from app.utils.formats import jsonify
 from datetime import timedelta, datetime
 from .utils import roles_required
+from app.utils.readme import readme_hash, render_readme
+from app.utils.search import (
+    set_search_vector, index_project, unindex_project)
+from app.utils.refdata import missing_ids, topic_ids
 
 
 @api.route('/project', methods=['GET'])
@@ -26,8 +34,9 @@ def get_all_projects():
             error: NoResultFound 404
                    SQLAlchemyError 400
     """
-    # Try to get all projects from database
-    query = Project.query
+    # Try to get all projects from database, loading their topics
+    # up front so serializing doesn't query once per project
+    query = Project.query.options(selectinload(Project.topics))
 
     try:
         projects = query.all()
@@ -44,8 +53,10 @@ def get_all_projects():
     except SQLAlchemyError:
         return jsonify({'error': 'Some problem occurred!'}), 400
 
-    # Serialize array of projects
-    project_schema = ProjectSchema(many=True)
+    # Serialize array of projects without their READMEs, which
+    # are served by get_project_readme
+    project_schema = ProjectSchema(
+        many=True, exclude=('read_me', 'read_me_html'))
     output = project_schema.dump(projects).data
 
     # Return json response
@@ -58,6 +69,84 @@ def get_all_projects():
     ), 200
 
 
+@api.route('/project/filter', methods=['GET'])
+def filter_projects():
+    """
+    This route gets the projects tagged with all of the topics in the
+    comma separated topics query parameter, ordered by the summed
+    profeciency of those topics, then by title, and returns the array
+    as a json object.
+
+    Returns {Object<json>} 200
+            num_results: {string}
+            success: {string}
+            projects: {Object<json>}
+
+    Throws {Exception{Object<json>}}
+            error: MissingTopics 400
+                   SQLAlchemyError 400
+    """
+    # Get the topic names from the request
+    names = set(
+        name.strip() for name in request.args.get('topics', '').split(',')
+        if name.strip())
+
+    # If no topics were sent, return error
+    if not names:
+        return jsonify({'error': 'Missing topics!'}), 400
+
+    # Resolve the topic names from the cached topics, no project can
+    # match a topic that doesn't exist
+    ids = topic_ids(names)
+    if ids is None:
+        projects = []
+
+    else:
+        # Find the projects tagged with every topic using the
+        # (topic_id, project_id) index on project_topics
+        matches = db.session.query(
+            ProjectTopics.project_id,
+            func.sum(Topic.profeciency).label('profeciency')
+        ).join(
+            Topic, Topic.id == ProjectTopics.topic_id
+        ).filter(
+            ProjectTopics.topic_id.in_(ids)
+        ).group_by(
+            ProjectTopics.project_id
+        ).having(
+            func.count(ProjectTopics.topic_id) == len(ids)
+        ).subquery()
+
+        query = Project.query.join(
+            matches, Project.id == matches.c.project_id
+        ).options(
+            selectinload(Project.topics)
+        ).order_by(
+            matches.c.profeciency.desc(), Project.title)
+
+        # Try to get the matching projects from database
+        try:
+            projects = query.all()
+
+        # If some sqlalchemy error is thrown, return error
+        except SQLAlchemyError:
+            return jsonify({'error': 'Some problem occurred!'}), 400
+
+    # Serialize array of projects without their READMEs
+    project_schema = ProjectSchema(
+        many=True, exclude=('read_me', 'read_me_html'))
+    output = project_schema.dump(projects).data
+
+    # Return json response
+    return jsonify(
+        {
+            'num_results': str(len(output)),
+            'success': 'Successfully retrieved projects!',
+            'projects': output,
+        }
+    ), 200
+
+
 @api.route('/project/<id>', methods=['GET'])
 def get_one_project(id):
     """
@@ -76,7 +165,8 @@ def get_one_project(id):
                    NotAuthorized 401
     """
     # Try to get project from database
-    query = Project.query.filter_by(id=id)
+    query = Project.query.options(
+        selectinload(Project.topics)).filter_by(id=id)
 
     try:
         project = query.one()
@@ -99,6 +189,89 @@ def get_one_project(id):
     }), 200
 
 
+@api.route('/project/<id>/readme', methods=['GET'])
+def get_project_readme(id):
+    """
+    This route gets the README of a single project from the database
+    and returns it as markdown, or as the cached sanitized html if the
+    format=html query parameter is sent. The response has an ETag so
+    clients can revalidate it and is gzipped if the client accepts gzip.
+
+    Args {string} id
+
+    Returns {string} read_me 200
+            {None} 304 if the client's copy is current
+
+    Throws {Exception{Object<json>}}
+            error: NoResultFound 404
+                   SQLAlchemyError 400
+    """
+    as_html = request.args.get('format') == 'html'
+
+    # Try to get only the project's README from database
+    query = Project.query.options(
+        load_only('id'), undefer_group('read_me')).filter_by(id=id)
+
+    try:
+        project = query.one()
+
+    # If no result found, return error
+    except NoResultFound:
+        return jsonify({'error': 'No result found!'}), 404
+
+    # If some other sqlalchemy error is thrown, return error
+    except SQLAlchemyError:
+        return jsonify({'error': 'Some problem occurred!'}), 400
+
+    # READMEs the migration didn't render are rendered on the fly,
+    # so reading a README never writes to the database
+    read_me = project.read_me or b''
+    read_me_hash = project.read_me_hash
+    read_me_html = project.read_me_html
+    if read_me_hash is None or read_me_html is None:
+        read_me_hash = readme_hash(read_me)
+        read_me_html = render_readme(read_me)
+
+    if as_html:
+        body = read_me_html.encode('utf-8')
+        content_type = 'text/html; charset=utf-8'
+    else:
+        body = read_me
+        content_type = 'text/markdown; charset=utf-8'
+
+    # Gzip the README if the client accepts it and it is worth it
+    use_gzip = (
+        len(body) >= current_app.config.get('README_GZIP_MIN_SIZE', 512) and
+        'gzip' in request.accept_encodings)
+
+    # Each format and encoding gets its own ETag
+    etag = read_me_hash
+    if as_html:
+        etag += '-html'
+    if use_gzip:
+        etag += '-gzip'
+
+    # If the client already has this version, don't send it again
+    if request.if_none_match.contains(etag):
+        response = make_response('', 304)
+        response.set_etag(etag)
+        response.vary.add('Accept-Encoding')
+        return response
+
+    if use_gzip:
+        body = gzip.compress(body)
+
+    response = make_response(body, 200)
+    response.content_type = content_type
+    response.set_etag(etag)
+    response.vary.add('Accept-Encoding')
+    response.cache_control.no_cache = True
+    if use_gzip:
+        response.content_encoding = 'gzip'
+
+    return response
+
+
 @api.route('/project', methods=['POST'])
 @jwt_required
 @roles_required('admin')
@@ -149,6 +322,10 @@ def create_project():
     if not data['title'] or not data['description']:
         return make_response(jsonify({'error': 'Missing data!'}), 400)
 
+    # Verify that all of the sent topics exist
+    if missing_ids('topic', data.get('topics') or []):
+        return jsonify({'error': 'Topic not found!'}), 400
+
     # Create project object
     project = Project(
         title=data['title'],
@@ -169,48 +346,39 @@ def create_project():
         project.github_url = data['github_url']
 
     if 'read_me' in data:
-        project.read_me = data['read_me'].encode()
+        project.set_read_me(data['read_me'])
 
     if 'topic_main' in data:
         project.topic_main = data['topic_main']
 
-    # Try to add project to database
+    # Try to add project and its topics to database in one transaction
     try:
         db.session.add(project)
+        db.session.flush()
+
+        if 'topics' in data:
+            ProjectTopics.sync(project.id, data['topics'])
+
+        # Update the project's search vector with its new topics
+        db.session.expire(project, ['topics'])
+        set_search_vector(project)
+
         db.session.commit()
 
     # If project name already in database, return error
     except IntegrityError:
+        db.session.rollback()
         return jsonify({
             'error': 'User with name or email already exists'
         }), 400
 
     # If some other sqlalchemy error is thrown, return error
     except SQLAlchemyError:
+        db.session.rollback()
         return jsonify({'error': 'Some problem occurred!'}), 400
 
-    if 'topics' in data:
-        for id in data['topics']:
-
-            # Create project topics object
-            project_topics = ProjectTopics(
-                project_id=project.id,
-                topic_id=id)
-
-            # Try to add project_topics to database
-            try:
-                db.session.add(project_topics)
-                db.session.commit()
-
-            # If project name already in database, return error
-            except IntegrityError:
-                return jsonify({
-                    'error': 'User with name or email already exists'
-                }), 400
-
-            # If some other sqlalchemy error is thrown, return error
-            except SQLAlchemyError:
-                return jsonify({'error': 'Some problem occurred!'}), 400
+    # Add the saved project to the in-memory search index
+    index_project(project)
 
     # Serialze the project object and return json response
     project_schema = ProjectSchema()
@@ -280,6 +448,10 @@ def edit_project(id):
     # Get the project data from the request
     data = request.get_json()
 
+    # Verify that all of the sent topics exist
+    if missing_ids('topic', data.get('topics') or []):
+        return jsonify({'error': 'Topic not found!'}), 400
+
     # Update project data if it was sent and save in database
     if 'title' in data:
         project.title = data['title']
@@ -300,67 +472,36 @@ def edit_project(id):
         project.github_url = data['github_url']
 
     if 'read_me' in data:
-        project.read_me = data['read_me'].encode()
+        project.set_read_me(data['read_me'])
 
     if 'topic_main' in data:
         project.topic_main = data['topic_main']
 
-    db.session.commit()
+    # Try to save the project and sync its topics in one transaction
+    try:
+        if 'topics' in data:
+            ProjectTopics.sync(project.id, data['topics'])
 
-    # Try to get the project topics from the database
-    query = ProjectTopics.query.filter_by(project_id=project.id)
+        # Update the project's search vector with its new topics
+        db.session.expire(project, ['topics'])
+        set_search_vector(project)
 
-    try:
-        topics = query.all()
+        db.session.commit()
 
-    # If no result found, return error
-    except NoResultFound:
-        return jsonify({'error': 'No result found!'}), 404
+    # If project title or topic already in database, return error
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({
+            'error': 'Project with title already exists'
+        }), 400
 
     # If some other sqlalchemy error is thrown, return error
     except SQLAlchemyError:
+        db.session.rollback()
         return jsonify({'error': 'Some problem occurred!'}), 400
 
-    topicIds = []
-
-    # topicIds = [1, 2]
-    # data['topics'] = [1, 2, 3, 4, 5] 3, 4, 5 added, 1,2 deleted
-    for topic in topics:
-        topicIds.append(topic.topic_id)
-
-    app.logger.info(topicIds)
-
-    if 'topics' in data:
-        for id in data['topics']:
-            app.logger.info(id)
-            if id not in topicIds:
-                # Create project topics object
-                project_topics = ProjectTopics(
-                    project_id=project.id,
-                    topic_id=id)
-
-                # Try to add project_topics to database
-                try:
-                    db.session.add(project_topics)
-                    db.session.commit()
-
-                # If project name already in database, return error
-                except IntegrityError:
-                    return jsonify({
-                        'error': 'User with name or email already exists'
-                    }), 400
-
-                # If some other sqlalchemy error is thrown, return error
-                except SQLAlchemyError:
-                    return jsonify({'error': 'Some problem occurred!'}), 400
-
-        for id in topicIds:
-            if id not in data['topics']:
-                index = topicIds.index(id)
-                topic = topics[index]
-
-                db.session.delete(topic)
-                db.session.commit()
+    # Update the saved project in the in-memory search index
+    index_project(project)
 
     # Serialize project
     project_schema = ProjectSchema()
@@ -408,12 +549,14 @@ def delete_project(id):
     except SQLAlchemyError:
         return jsonify({'error': 'Some problem occurred!'}), 400
 
-    # Delete the project from the database
+    # Delete the project from the database and the search index
+    project_id = project.id
     db.session.delete(project)
     db.session.commit()
+    unindex_project(project_id)
 
     # Create json and return response
     return jsonify({
         'success': 'The project has been deleted!',
-        'id': str(project.id)
+        'id': str(project_id)
     })
@@ -0,0 +1,49 @@
+from app import db
+from flask import request
+from sqlalchemy.exc import SQLAlchemyError
+from app.api import api
+from app.utils.formats import jsonify
+from app.utils.search import search_projects
+
+
+@api.route('/search', methods=['GET'])
+def search():
+    """
+    This route searches project titles, descriptions, topics and
+    READMEs for the words in the q query parameter and returns the
+    ranked results with highlighted matches as a json object.
+
+    Returns {Object<json>} 200
+            num_results: {string}
+            success: {string}
+            results: {Object<json>}
+
+    Throws {Exception{Object<json>}}
+            error: MissingQuery 400
+                   SQLAlchemyError 400
+    """
+    # Get the search query from the request
+    q = request.args.get('q', '').strip()
+
+    # If no query was sent, return error
+    if not q:
+        return jsonify({'error': 'Missing search query!'}), 400
+
+    limit = min(request.args.get('limit', 20, type=int), 100)
+
+    # Try to search the projects
+    try:
+        results = search_projects(q, limit)
+
+    # If some sqlalchemy error is thrown, return error
+    except SQLAlchemyError:
+        return jsonify({'error': 'Some problem occurred!'}), 400
+
+    # Return json response
+    return jsonify(
+        {
+            'num_results': str(len(results)),
+            'success': 'Successfully searched projects!',
+            'results': results,
+        }
+    ), 200
@@ -1,5 +1,5 @@
-from app import app, db
-from flask import request, jsonify, make_response
+from app import db
+from flask import request, make_response
 from app.models import Team, TeamSchema, User
 from flask_jwt_extended import (
     jwt_required, jwt_optional, get_jwt_identity
@@ -7,6 +7,7 @@ from flask_jwt_extended import (
 from sqlalchemy.orm.exc import NoResultFound
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from app.api import api
+from app.utils.formats import jsonify
 from datetime import timedelta, datetime
 from .utils import roles_required
 
@@ -1,5 +1,5 @@
-from app import app, db
-from flask import request, jsonify, make_response
+from app import db
+from flask import request, make_response
 from app.models import Topic, TopicSchema, User, UserSchema
 from flask_jwt_extended import (
     jwt_required, jwt_optional, get_jwt_identity
@@ -7,8 +7,11 @@ from flask_jwt_extended import (
 from sqlalchemy.orm.exc import NoResultFound
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from app.api import api
+from app.utils.formats import jsonify
 from datetime import timedelta, datetime
 from .utils import roles_required
+from app.utils.search import (
+    topic_projects, set_search_vectors, index_projects)
 
 
 @api.route('/topic', methods=['GET'])
@@ -242,7 +245,12 @@ def edit_topic(id):
     if data['profeciency']:
         topic.profeciency = data['profeciency']
 
+    # The topic name is part of its projects' searchable text
+    project_ids = topic_projects(topic.id) if data['name'] else []
+    set_search_vectors(project_ids)
+
     db.session.commit()
+    index_projects(project_ids)
 
     # Serialize topic
     topic_schema = TopicSchema()
@@ -290,9 +298,13 @@ def delete_topic(id):
     except SQLAlchemyError:
         return jsonify({'error': 'Some problem occurred!'}), 400
 
-    # Delete the topic from the database
+    # Delete the topic from the database, and from its projects'
+    # searchable text
+    project_ids = topic_projects(topic.id)
     db.session.delete(topic)
+    set_search_vectors(project_ids)
     db.session.commit()
+    index_projects(project_ids)
 
     # Create json and return response
     return jsonify({'success': 'The topic has been deleted!'})
@@ -0,0 +1,36 @@
+from app import db
+from sqlalchemy.exc import SQLAlchemyError
+from app.api import api
+from app.utils.formats import jsonify
+from app.utils.tournament import get_tournament_state
+
+
+@api.route('/tournament', methods=['GET'])
+def get_tournament():
+    """
+    This route gets the group tables and the actual bracket resolved
+    from the team standings and knockout match results and returns
+    them as a json object.
+
+    Returns {Object<json>} 200
+            success: {string}
+            groups: {Object<json>}
+            bracket: {Object<json>}
+
+    Throws {Exception{Object<json>}}
+            error: SQLAlchemyError 400
+    """
+    # Try to get the resolved tournament state
+    try:
+        state = get_tournament_state()
+
+    # If some sqlalchemy error is thrown, return error
+    except SQLAlchemyError:
+        return jsonify({'error': 'Some problem occurred!'}), 400
+
+    # Return json response
+    return jsonify({
+        'success': 'Successfully retrieved tournament.',
+        'groups': state['groups'],
+        'bracket': state['bracket'],
+    }), 200
@@ -1,7 +1,7 @@
-from app import app, db
+from app import db
 from os import urandom
 from base64 import b64encode
-from flask import request, jsonify, make_response
+from flask import request, make_response, current_app
 from app.models import User, UserSchema, RoleSchema, OAuth
 from flask_jwt_extended import (
         jwt_required, jwt_optional, get_jwt_identity,
@@ -9,9 +9,11 @@ from flask_jwt_extended import (
         set_access_cookies, set_refresh_cookies,
         get_csrf_token
 )
+from sqlalchemy.orm import selectinload, joinedload
 from sqlalchemy.orm.exc import NoResultFound
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from app.api import api
+from app.utils.formats import jsonify
 from werkzeug.security import generate_password_hash, check_password_hash
 import jwt
 from datetime import timedelta, datetime
@@ -34,8 +36,10 @@ def get_all_users():
             error: NoResultFound 404
                    SQLAlchemyError 400
     """
-    # Try to get all users from database
-    query = User.query
+    # Try to get all users from database, loading their roles and
+    # bracket up front so serializing doesn't query once per user
+    query = User.query.options(
+        selectinload(User.roles), joinedload(User.bracket))
 
     try:
         users = query.all()
@@ -92,7 +96,9 @@ def get_one_user(public_id):
         return jsonify({'error': 'Not authorized!'}), 401
 
     # Try to get user from database
-    query = User.query.filter_by(public_id=uid)
+    query = User.query.options(
+        selectinload(User.roles), joinedload(User.bracket)
+    ).filter_by(public_id=uid)
 
     try:
         user = query.one()
@@ -283,7 +289,7 @@ def edit_user(id):
         # Decode the jwt token
         try:
             jwt_data = jwt.decode(
-                token, app.config.get('SECRET_KEY'), algorithm='HS256')
+                token, current_app.config.get('SECRET_KEY'), algorithm='HS256')
 
         # If the token has expired, return error
         except jwt.ExpiredSignatureError:
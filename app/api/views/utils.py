@@ -1,10 +1,10 @@
-from app.models import User, RoleSchema
+from app import db
+from app.models import UserRoles
+from app.utils import refdata
 from flask_jwt_extended import get_jwt_identity
-from sqlalchemy.orm.exc import NoResultFound
-from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.exc import SQLAlchemyError
 from functools import wraps
 from flask import jsonify
-from app import app
 
 
 def roles_required(*role_names):
@@ -24,30 +24,19 @@ def roles_required(*role_names):
             # Get user id from jwt token
             public_id = get_jwt_identity()
 
-            # Try to find user in database
-            query = User.query.filter_by(public_id=public_id)
+            # Try to get the user's role ids from the database
+            query = db.session.query(
+                UserRoles.role_id).filter_by(user_id=public_id)
 
             try:
-                user = query.first()
+                role_ids = [row.role_id for row in query]
 
-            # If no result found, return error
-            except NoResultFound:
-                return jsonify({'error': 'No result found!'}), 404
-
-            # If some other sqlalchemy error is thrown, return error
+            # If some sqlalchemy error is thrown, return error
             except SQLAlchemyError:
                 return jsonify({'error': 'Some problem occurred!'}), 400
 
-            # Create array of the user's roles
-            role_schema = RoleSchema(many=True)
-            output = role_schema.dump(user.roles).data
-            app.logger.info(output)
-            roles = []
-            for role in output:
-                roles.append(role['name'])
-
-            app.logger.info(roles)
-            app.logger.info(role_names)
+            # Create array of the user's role names from the cached roles
+            roles = refdata.role_names(role_ids)
 
             # Loop through the required roles, and return an error
             # if a required role is not found in the user's roles
@@ -78,26 +67,19 @@ def roles_accepted(*role_names):
             # Get user id from jwt token
             public_id = get_jwt_identity()
 
-            # Try to find user in the database
-            query = User.query.filter_by(public_id=public_id)
+            # Try to get the user's role ids from the database
+            query = db.session.query(
+                UserRoles.role_id).filter_by(user_id=public_id)
 
             try:
-                user = query.first()
-
-            # If no result found, return error
-            except NoResultFound:
-                return jsonify({'error': 'No result found!'}), 404
+                role_ids = [row.role_id for row in query]
 
-            # If some other sqlalchemy error is thrown, return error
+            # If some sqlalchemy error is thrown, return error
             except SQLAlchemyError:
                 return jsonify({'error': 'Some problem occurred!'}), 400
 
-            # Create array of the user's roles
-            role_schema = RoleSchema(many=True)
-            output = role_schema.dump(user.roles).data
-            roles = []
-            for role in output:
-                roles.append(role['name'])
+            # Create array of the user's role names from the cached roles
+            roles = refdata.role_names(role_ids)
 
             # Loop through the required roles, and return an error
             # if not a single accepted role is found in the user's roles
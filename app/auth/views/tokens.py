@@ -1,4 +1,4 @@
-from app import jwt, app
+from app import jwt
 from flask import (
     make_response, request, jsonify, render_template)
 from flask_jwt_extended import (
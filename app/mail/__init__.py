@@ -1,4 +1,5 @@
 from flask import Blueprint
+from app.utils.lazy import LazyView
 
 
 # Setup site blueprint
@@ -10,5 +11,16 @@ mail = Blueprint(
     static_url_path='/app/emails/static'
 )
 
-# Import blueprint views
-from .views import emails, contact, send_email  # noqa
+# Register blueprint views, which are only imported when first used
+mail.add_url_rule(
+    '/confirm/email/<token>', 'confirm_email',
+    LazyView('app.mail.views.emails.confirm_email'), methods=['GET'])
+mail.add_url_rule(
+    '/password/forgot', 'forgot_password',
+    LazyView('app.mail.views.emails.forgot_password'), methods=['POST'])
+mail.add_url_rule(
+    '/contact', 'contact',
+    LazyView('app.mail.views.contact.contact'), methods=['POST'])
+mail.add_url_rule(
+    '/email', 'email',
+    LazyView('app.mail.views.send_email.email'), methods=['POST'])
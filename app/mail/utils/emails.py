@@ -1,5 +1,4 @@
 from flask_mail import Message
-from app import app, mail
 from flask import render_template, current_app
 
 
@@ -98,7 +97,7 @@ def send_confirm_email_email(user, user_email, confirm_email_link):
     subject, html_message, text_message = _render_email(
             '/confirm_email',
             user=user,
-            app_name=app.config.get('APP_NAME'),
+            app_name=current_app.config.get('APP_NAME'),
             confirm_email_link=confirm_email_link)
 
     # Send email message using Flask-Mail
@@ -120,7 +119,7 @@ def send_forgot_password_email(user, user_email, reset_password_link):
     subject, html_message, text_message = _render_email(
             '/forgot_password',
             user=user,
-            app_name=app.config.get('APP_NAME'),
+            app_name=current_app.config.get('APP_NAME'),
             reset_password_link=reset_password_link)
 
     # Send email message using Flask-Mail
@@ -134,7 +133,7 @@ def send_contact_email(user, message):
         {string} message
     '''
     # Retrieve email address from User or UserEmail object
-    email = app.config.get('MAIL_USERNAME')
+    email = current_app.config.get('MAIL_USERNAME')
     assert(email)
 
     # Render subject, html message and text message
@@ -160,7 +159,7 @@ def send_thank_you_email(user):
     subject, html_message, text_message = _render_email(
             '/thank_you',
             user=user,
-            app_name=app.config.get('APP_NAME'))
+            app_name=current_app.config.get('APP_NAME'))
 
     # Send email message using Flask-Mail
     send_email(email, subject, html_message, text_message)
@@ -181,7 +180,7 @@ def send_all_email(user, subj, message):
             user=user,
             subj=subj,
             message=message,
-            app_name=app.config.get('APP_NAME'))
+            app_name=current_app.config.get('APP_NAME'))
 
     # Send email message using Flask-Mail
     send_email(email, subject, html_message, text_message)
@@ -1,10 +1,7 @@
-from app.mail import mail
 from app.mail.utils.emails import send_contact_email, send_thank_you_email
-from flask import request, jsonify
-from app import app
+from flask import request, jsonify, current_app
 
 
-@mail.route('/contact', methods=['POST'])
 def contact():
     '''This path takes in contact info and sends an email to
     support@pydino.com as well as an email to the contact user
@@ -32,6 +29,6 @@ def contact():
 
     # Return json response with success message
     success = ('Your message has been sent to %s. '
-               'Our team will get back to you shortly.') % (app.config.get('MAIL_USERNAME'))
+               'Our team will get back to you shortly.') % (current_app.config.get('MAIL_USERNAME'))
 
     return jsonify({'success': success}), 200
@@ -1,18 +1,16 @@
-from app.mail import mail
 from app.mail.utils.emails import send_forgot_password_email
-from flask import request, make_response, jsonify
+from flask import request, make_response, jsonify, current_app
 from flask_jwt_extended import (
     create_access_token, create_refresh_token, set_access_cookies,
     set_refresh_cookies, get_csrf_token)
 from datetime import datetime, timedelta
-from app import app, db
+from app import db
 from app.models import User, UserSchema
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.orm.exc import NoResultFound
 import jwt
 
 
-@mail.route('/confirm/email/<token>', methods=['GET'])
 def confirm_email(token):
     '''This route takes in a token from the confirmation email
     link to authenticate the user. It returns the user json object
@@ -28,7 +26,7 @@ def confirm_email(token):
     token = token.encode("utf-8")
     try:
         data = jwt.decode(
-            token, app.config.get('SECRET_KEY'), algorithm='HS256')
+            token, current_app.config.get('SECRET_KEY'), algorithm='HS256')
 
     # If the token is expired, return error
     except jwt.ExpiredSignatureError:
@@ -110,7 +108,6 @@ def confirm_email(token):
     return response
 
 
-@mail.route('/password/forgot', methods=['POST'])
 def forgot_password():
     '''This path takes in a username or email and sends a
     reset password link to the user's email if the user exists.
@@ -165,7 +162,7 @@ def forgot_password():
             'public_id': user.public_id,
             'exp': datetime.utcnow() + timedelta(seconds=500)
         },
-        app.config.get('SECRET_KEY'),
+        current_app.config.get('SECRET_KEY'),
         algorithm='HS256')
 
     token = token.decode("utf-8")
@@ -173,7 +170,7 @@ def forgot_password():
     # Create reset password link
     reset_password_link = (
         '%spassword/reset?token=%s&public_id=%s' % (
-            app.config.get('DOMAIN'), token, user.public_id))
+            current_app.config.get('DOMAIN'), token, user.public_id))
 
     # Send reset password email to user
     send_forgot_password_email(user, email, reset_password_link)
@@ -1,11 +1,8 @@
-from app.mail import mail
 from app.mail.utils.emails import send_all_email
 from app.models import User
 from flask import request, jsonify
-from app import app
 
 
-@mail.route('/email', methods=['POST'])
 def email():
     '''This path sends an email to all users from support@pydino.com
 
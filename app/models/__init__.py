@@ -2,6 +2,6 @@ from .user import (User, OAuth, Role, UserRoles, UserSchema, RoleSchema,
     UserRolesSchema)
 from .project import (Project, Topic, ProjectTopics, ProjectSchema,
     TopicSchema, ProjectTopicsSchema)
-from .team import Team, TeamSchema
+from .team import Team, TeamSchema, TeamSummarySchema
 from .bracket import Bracket, BracketSchema
-from .match import Match, MatchSchema
+from .match import Match, MatchSchema, MatchTeamsSchema
@@ -1,6 +1,7 @@
 from app import db, ma
 from marshmallow_sqlalchemy import ModelSchema
 from marshmallow import fields
+from flask import current_app
 from .team import Team
 
 
@@ -12,7 +13,7 @@ class Match(db.Model):
     team1_id = db.Column(db.Integer(), db.ForeignKey('team.id'))
     team2_id = db.Column(db.Integer(), db.ForeignKey('team.id'))
     date = db.Column(db.DateTime(timezone=True), nullable=False)
-    round = db.Column(db.String(32), nullable=False)
+    round = db.Column(db.String(32), index=True, nullable=False)
     title = db.Column(db.String(32), nullable=False)
     team1_score = db.Column(db.Integer(), default=0)
     team2_score = db.Column(db.Integer(), default=0)
@@ -25,3 +26,22 @@ class MatchSchema(ma.ModelSchema):
     class Meta:
         model = Match
         ordered = True
+
+    # Dump the team ids from the foreign keys so the teams aren't loaded
+    team1 = fields.Integer(attribute='team1_id')
+    team2 = fields.Integer(attribute='team2_id')
+
+
+# Define MatchTeamsSchema with both team summaries embedded from the
+# cached reference data
+class MatchTeamsSchema(MatchSchema):
+    team1 = fields.Method('get_team1')
+    team2 = fields.Method('get_team2')
+
+    def get_team1(self, match):
+        return current_app.extensions['refdata'].get('team').get(
+            match.team1_id)
+
+    def get_team2(self, match):
+        return current_app.extensions['refdata'].get('team').get(
+            match.team2_id)
@@ -1,6 +1,9 @@
 from app import db, ma
 from marshmallow_sqlalchemy import ModelSchema
 from marshmallow import fields
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from app.utils.readme import readme_hash, render_readme
+from app.utils.bus import mark_written
 
 
 # Define Project model
@@ -14,8 +17,17 @@ class Project(db.Model):
     title = db.Column(db.String(48), unique=True, nullable=False)
     description = db.Column(db.String(256), nullable=False)
     created_at = db.Column(db.DateTime(), nullable=True)
-    read_me = db.Column(db.LargeBinary(), server_default='')
+    # Only loaded when accessed so listing projects skips the READMEs
+    read_me = db.deferred(
+        db.Column(db.LargeBinary(), server_default=''), group='read_me')
+    read_me_hash = db.deferred(
+        db.Column(db.String(64), nullable=True), group='read_me')
+    read_me_html = db.deferred(
+        db.Column(db.Text(), nullable=True), group='read_me')
     topic_main = db.Column(db.String(32), server_default='')
+    # Weighted full-text search vector, only used on PostgreSQL
+    search_vector = db.deferred(db.Column(
+        TSVECTOR().with_variant(db.Text(), 'sqlite'), nullable=True))
     topics = db.relationship(
         'Topic',
         cascade='all,delete',
@@ -23,6 +35,21 @@ class Project(db.Model):
         backref=db.backref('project', lazy='dynamic')
     )
 
+    def set_read_me(self, read_me):
+        """Sets the README and renders its html if it changed"""
+        read_me = read_me.encode()
+        content_hash = readme_hash(read_me)
+
+        self.read_me = read_me
+        if content_hash != self.read_me_hash or self.read_me_html is None:
+            self.read_me_hash = content_hash
+            self.read_me_html = render_readme(read_me)
+
+
+db.Index(
+    'ix_project_search_vector', Project.__table__.c.search_vector,
+    postgresql_using='gin')
+
 
 # Define Topic model
 class Topic(db.Model):
@@ -35,6 +62,11 @@ class Topic(db.Model):
 # Define ProjectTopics model
 class ProjectTopics(db.Model):
     __tablename__ = 'project_topics'
+    __table_args__ = (
+        db.UniqueConstraint(
+            'project_id', 'topic_id', name='uq_project_topics_project_topic'),
+        db.Index('ix_project_topics_topic_project', 'topic_id', 'project_id'),
+    )
     id = db.Column(db.Integer(), primary_key=True)
     project_id = db.Column(
         db.Integer(),
@@ -45,14 +77,50 @@ class ProjectTopics(db.Model):
         db.ForeignKey('topic.id', ondelete='CASCADE')
     )
 
+    @classmethod
+    def sync(cls, project_id, topic_ids):
+        """Makes the project's topics exactly topic_ids with at most one
+        bulk insert and one bulk delete. Doesn't commit, so the caller
+        can commit it in the same transaction as the project.
+
+        Arg {int} project_id
+            {Array<int>} topic_ids
+        """
+        wanted = set(int(topic_id) for topic_id in topic_ids)
+        current = set(
+            row.topic_id for row in db.session.query(cls.topic_id)
+            .filter_by(project_id=project_id))
+
+        added = wanted - current
+        removed = current - wanted
+
+        # The insert bypasses the session, so record it for the
+        # invalidation bus
+        if added:
+            mark_written(cls.__tablename__)
+            db.session.execute(cls.__table__.insert(), [
+                {'project_id': project_id, 'topic_id': topic_id}
+                for topic_id in sorted(added)
+            ])
+
+        if removed:
+            cls.query.filter(
+                cls.project_id == project_id,
+                cls.topic_id.in_(removed)
+            ).delete(synchronize_session=False)
+
 
 # Define ProjectSchema
 class ProjectSchema(ma.ModelSchema):
     class Meta:
         model = Project
         ordered = True
+        exclude = ('read_me_hash', 'search_vector')
 
-    topics = fields.Nested('TopicSchema', many=True, load=True)
+    # Exclude the topics' dynamic project backref, which would query
+    # all projects of every topic
+    topics = fields.Nested(
+        'TopicSchema', many=True, load=True, exclude=('project',))
 
 
 # Define TopicSchema
@@ -9,7 +9,7 @@ class Team(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(40), unique=True, nullable=False)
     iso_2 = db.Column(db.CHAR(2), nullable=False)
-    group = db.Column(db.CHAR(1), nullable=False)
+    group = db.Column(db.CHAR(1), index=True, nullable=False)
     MP = db.Column(db.Integer(), default=0)
     W = db.Column(db.Integer(), default=0)
     D = db.Column(db.Integer(), default=0)
@@ -25,3 +25,11 @@ class TeamSchema(ma.ModelSchema):
     class Meta:
         model = Team
         ordered = True
+
+
+# Define TeamSummarySchema for teams embedded in other objects
+class TeamSummarySchema(ma.ModelSchema):
+    class Meta:
+        model = Team
+        ordered = True
+        fields = ('id', 'name', 'iso_2', 'group')
@@ -1,6 +1,5 @@
 from app import db, ma
 import uuid
-from flask_dance.consumer.backend.sqla import OAuthConsumerMixin
 from marshmallow_sqlalchemy import ModelSchema
 from marshmallow import fields
 from sqlalchemy.ext.mutable import MutableDict
@@ -45,6 +44,11 @@ class User(db.Model):
 # Define OAuth model
 class OAuth(db.Model):
     __tablename__ = 'oauth'
+    __table_args__ = (
+        db.Index(
+            'ix_oauth_provider_provider_uid', 'provider', 'provider_uid',
+            unique=True),
+    )
     id = db.Column(db.Integer(), primary_key=True)
     provider = db.Column(db.String(50))
     token = db.Column(MutableDict.as_mutable(JSONType))
@@ -68,7 +72,8 @@ class UserRoles(db.Model):
     id = db.Column(db.Integer(), primary_key=True)
     user_id = db.Column(
         db.String(),
-        db.ForeignKey('user.public_id', ondelete='CASCADE')
+        db.ForeignKey('user.public_id', ondelete='CASCADE'),
+        index=True
     )
     role_id = db.Column(
         db.Integer(),
@@ -83,7 +88,10 @@ class UserSchema(ma.ModelSchema):
         ordered = True
         exclude = ('id', 'password', 'salt')
 
-    roles = fields.Nested('RoleSchema', many=True, load=True)
+    # Exclude the roles' dynamic user backref, which would query all
+    # users of every role
+    roles = fields.Nested(
+        'RoleSchema', many=True, load=True, exclude=('user',))
 
 
 # Define RoleSchema
@@ -0,0 +1,259 @@
+from app import db
+from app.mail.utils.emails import _render_email
+from app.models import User
+from app.utils.live import match_scores, sse_event, SSE_KEEPALIVE
+from asgiref.wsgi import WsgiToAsgi
+from flask_cors.core import get_cors_headers
+from werkzeug.datastructures import Headers
+from email.message import EmailMessage
+from functools import partial
+import aiosmtplib
+import asyncio
+import json
+
+
+class AsyncApp(object):
+    '''ASGI app that runs the I/O-bound endpoints as coroutines and
+    every other request through the Flask app in a thread pool.
+
+    The coroutines send the CORS headers of the Flask app's policies,
+    but skip its request hooks, so they aren't recorded by the metrics
+    or the profiler and their responses aren't compressed. Their json
+    bodies are small and the live stream isn't compressed by the Flask
+    app either.
+
+    Arg {Flask} app
+    '''
+
+    def __init__(self, app):
+        self.app = app
+        self.wsgi = WsgiToAsgi(app)
+        self.routes = {
+            ('POST', '/api/v1/contact'): self.contact,
+            ('POST', '/api/v1/email'): self.email,
+            ('GET', '/api/v1/live'): self.live,
+        }
+
+        # Each route gets the CORS policy of the blueprint the Flask
+        # app routes it to
+        default, policies = app.extensions['cors_policies']
+        adapter = app.url_map.bind('localhost')
+        self.policies = {}
+        for method, path in self.routes:
+            endpoint, _ = adapter.match(path, method)
+            self.policies[path] = policies.get(
+                endpoint.rpartition('.')[0], default)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+
+        if scope['type'] == 'http':
+            handler = self.routes.get((scope['method'], scope['path']))
+            if handler is not None:
+                return await handler(scope, receive, send)
+
+        return await self.wsgi(scope, receive, send)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def run_sync(self, func, *args):
+        '''Runs a blocking function in a thread inside an app context'''
+        def call():
+            with self.app.app_context():
+                try:
+                    return func(*args)
+                finally:
+                    db.session.remove()
+
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, call)
+
+    def headers(self, scope, content_type):
+        '''Returns the response headers, with the same CORS headers the
+        Flask app sends'''
+        request_headers = Headers([
+            (name.decode('latin-1'), value.decode('latin-1'))
+            for name, value in scope['headers']])
+        cors_headers = get_cors_headers(
+            self.policies[scope['path']], request_headers, scope['method'])
+
+        headers = [(b'content-type', content_type)]
+        for name, value in cors_headers.items():
+            headers.append(
+                (name.lower().encode('latin-1'), value.encode('latin-1')))
+        return headers
+
+    async def read_json(self, receive):
+        '''Reads the request body and parses it as json'''
+        body = b''
+        while True:
+            message = await receive()
+            body += message.get('body', b'')
+            if not message.get('more_body'):
+                break
+
+        try:
+            return json.loads(body.decode('utf-8')) if body else None
+        except ValueError:
+            return None
+
+    async def respond(self, scope, send, data, status=200):
+        '''Sends a json response'''
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': self.headers(scope, b'application/json'),
+        })
+        await send({
+            'type': 'http.response.body',
+            'body': json.dumps(data).encode('utf-8'),
+        })
+
+    async def send_email(self, recipient, subject, html_message,
+                         text_message):
+        '''Sends an email over SMTP without blocking the event loop'''
+        config = self.app.config
+
+        # Disable email sending like Flask-Mail, by default when testing
+        if config.get('MAIL_SUPPRESS_SEND', self.app.testing):
+            return
+
+        message = EmailMessage()
+        message['Subject'] = subject
+        message['From'] = config.get('MAIL_DEFAULT_SENDER') or \
+            config.get('MAIL_USERNAME')
+        message['To'] = recipient
+        message.set_content(text_message)
+        message.add_alternative(html_message, subtype='html')
+
+        await aiosmtplib.send(
+            message,
+            hostname=config.get('MAIL_SERVER', 'localhost'),
+            port=config.get('MAIL_PORT', 25),
+            username=config.get('MAIL_USERNAME'),
+            password=config.get('MAIL_PASSWORD'),
+            use_tls=config.get('MAIL_USE_SSL', False),
+            start_tls=config.get('MAIL_USE_TLS', False))
+
+    async def contact(self, scope, receive, send):
+        '''Async version of app.mail.views.contact.contact'''
+        data = await self.read_json(receive)
+        if not isinstance(data, dict) or \
+                not all(data.get(key) for key in ('name', 'email', 'message')):
+            return await self.respond(
+                scope, send, {'error': 'Missing username or email'}, 400)
+
+        user = {
+            'name': data['name'],
+            'email': data['email'],
+        }
+
+        app_name = self.app.config.get('APP_NAME')
+        support = self.app.config.get('MAIL_USERNAME')
+
+        # Render both emails in a thread, then send them concurrently
+        contact_email = await self.run_sync(partial(
+            _render_email, '/contact', user=user, message=data['message']))
+        thank_you_email = await self.run_sync(partial(
+            _render_email, '/thank_you', user=user, app_name=app_name))
+        await asyncio.gather(
+            self.send_email(support, *contact_email),
+            self.send_email(user['email'], *thank_you_email))
+
+        success = ('Your message has been sent to %s. '
+                   'Our team will get back to you shortly.') % (support)
+
+        return await self.respond(scope, send, {'success': success})
+
+    async def email(self, scope, receive, send):
+        '''Async version of app.mail.views.send_email.email'''
+        data = await self.read_json(receive)
+        if not isinstance(data, dict) or \
+                not all(data.get(key) for key in ('subject', 'message')):
+            return await self.respond(
+                scope, send, {'error': 'Missing subject or message'}, 400)
+
+        app_name = self.app.config.get('APP_NAME')
+
+        def render_all():
+            return [(user.email, _render_email(
+                '/email', user=user, subj=data['subject'],
+                message=data['message'], app_name=app_name))
+                for user in User.query.all()]
+
+        emails = await self.run_sync(render_all)
+        if not emails:
+            return await self.respond(
+                scope, send, {'error': 'No results found!'}, 404)
+
+        # Send the emails concurrently over a limited number of connections
+        semaphore = asyncio.Semaphore(
+            self.app.config.get('MAIL_CONCURRENCY', 10))
+
+        async def send_one(recipient, rendered):
+            async with semaphore:
+                await self.send_email(recipient, *rendered)
+
+        await asyncio.gather(*(
+            send_one(recipient, rendered) for recipient, rendered in emails))
+
+        success = 'Your message has been sent to all users'
+
+        return await self.respond(scope, send, {'success': success})
+
+    async def live(self, scope, receive, send):
+        '''Async version of app.api.views.live.live that streams until
+        the client disconnects'''
+        interval = self.app.config.get('LIVE_POLL_INTERVAL', 2)
+        disconnected = asyncio.Event()
+
+        async def wait_for_disconnect():
+            while True:
+                message = await receive()
+                if message['type'] == 'http.disconnect':
+                    disconnected.set()
+                    return
+
+        watcher = asyncio.ensure_future(wait_for_disconnect())
+
+        headers = self.headers(scope, b'text/event-stream')
+        headers.append((b'cache-control', b'no-cache'))
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': headers,
+        })
+
+        last = None
+        try:
+            while not disconnected.is_set():
+                scores = await self.run_sync(match_scores)
+
+                # Only send the scores if they changed
+                if scores != last:
+                    last = scores
+                    chunk = sse_event(scores)
+                else:
+                    chunk = SSE_KEEPALIVE
+
+                await send({
+                    'type': 'http.response.body',
+                    'body': chunk.encode('utf-8'),
+                    'more_body': True,
+                })
+
+                try:
+                    await asyncio.wait_for(disconnected.wait(), interval)
+                except asyncio.TimeoutError:
+                    pass
+
+        finally:
+            watcher.cancel()
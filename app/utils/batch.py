@@ -0,0 +1,241 @@
+from app import db
+from flask import current_app, request, g
+from flask_jwt_extended import view_decorators
+from http.cookies import SimpleCookie
+import flask_jwt_extended
+from werkzeug.test import EnvironBuilder
+from werkzeug.urls import url_parse
+import json
+
+
+# Request headers passed on to every sub-request
+FORWARDED_HEADERS = (
+    'Authorization', 'Cookie', 'X-CSRF-TOKEN', 'Accept-Language',
+    'User-Agent', 'X-Forwarded-For',
+)
+
+# Sub-response headers returned to the client, which the SPA reads
+RETURNED_HEADERS = ('access', 'refresh', 'ETag', 'Location')
+
+# Per-request state of the extensions that each sub-request keeps
+# for itself
+ISOLATED_STATE = ('metrics', 'profile')
+
+
+class BatchError(Exception):
+    pass
+
+
+def _decode_once(decode):
+    '''Wraps flask_jwt_extended's token decoding so the sub-requests
+    of a batch decode the shared credentials only once. The decoded
+    tokens are kept on g, which the sub-requests share with the batch.
+    '''
+    def decode_jwt_from_request(request_type):
+        cache = g.get('batch_jwt')
+        if cache is None:
+            return decode(request_type)
+
+        # Sub-requests with CSRF protected methods also check the
+        # CSRF token, so they are decoded separately
+        csrf_methods = current_app.config.get('JWT_CSRF_METHODS') or ()
+        key = (request_type, request.method in csrf_methods)
+        if key not in cache:
+            cache[key] = decode(request_type)
+        return cache[key]
+
+    decode_jwt_from_request.batch_wrapped = True
+    return decode_jwt_from_request
+
+
+# The wrapper replaces a private function of flask_jwt_extended, which
+# is pinned in requirements.txt for this reason. Outside of a batch it
+# calls the original unchanged, and it is left out on other major
+# versions, where batches simply decode the tokens per sub-request
+_decode = getattr(view_decorators, '_decode_jwt_from_request', None)
+if (_decode is not None and
+        flask_jwt_extended.__version__.startswith('3.') and
+        not getattr(_decode, 'batch_wrapped', False)):
+    view_decorators._decode_jwt_from_request = _decode_once(_decode)
+
+
+def _environ(sub_request):
+    '''Builds the WSGI environ of a sub-request from the batch request
+
+    Arg {Object} sub_request - method, path, body
+
+    Returns {Object} environ
+    '''
+    if not isinstance(sub_request, dict) or \
+            not isinstance(sub_request.get('path'), str):
+        raise BatchError('Every request needs a path!')
+
+    method = str(sub_request.get('method', 'GET')).upper()
+    url = url_parse(sub_request['path'])
+    if url.scheme or url.netloc or not url.path.startswith('/'):
+        raise BatchError('Paths must be absolute paths of this app!')
+
+    headers = {
+        name: request.headers[name] for name in FORWARDED_HEADERS
+        if name in request.headers
+    }
+    headers['Accept'] = 'application/json'
+
+    body = sub_request.get('body')
+    builder = EnvironBuilder(
+        path=url.path,
+        query_string=url.query,
+        method=method,
+        headers=headers,
+        data=json.dumps(body) if body is not None else None,
+        content_type='application/json' if body is not None else None,
+        base_url=request.url_root,
+        environ_base={'REMOTE_ADDR': request.remote_addr})
+
+    try:
+        return builder.get_environ()
+    finally:
+        builder.close()
+
+
+def _cookies(header):
+    '''Returns the cookies of a Cookie header by name, still encoded'''
+    cookies = SimpleCookie()
+    cookies.load(header or '')
+    return {name: morsel.coded_value for name, morsel in cookies.items()}
+
+
+def _set_cookies(cookies, headers):
+    '''Applies the Set-Cookie headers of a sub-response to the cookies
+    sent with the next sub-requests
+
+    Arg {Object} cookies - encoded cookies by name
+        {Array<string>} headers
+
+    Returns {bool} True if the cookies changed
+    '''
+    changed = False
+    for header in headers:
+        parsed = SimpleCookie()
+        parsed.load(header)
+        for name, morsel in parsed.items():
+            # Deleted cookies are set empty, or expire immediately
+            if not morsel.value or morsel['max-age'] == '0' or \
+                    '1970' in morsel['expires']:
+                changed = cookies.pop(name, None) is not None or changed
+            elif cookies.get(name) != morsel.coded_value:
+                cookies[name] = morsel.coded_value
+                changed = True
+    return changed
+
+
+def _dispatch(environ):
+    '''Runs a sub-request through the app's hooks and views in the
+    current app context, so it shares its database session and g
+
+    Arg {Object} environ
+
+    Returns {Response} response
+    '''
+    app = current_app._get_current_object()
+    saved = {name: g.pop(name) for name in ISOLATED_STATE if name in g}
+
+    try:
+        with app.request_context(environ):
+            try:
+                return app.full_dispatch_request()
+
+            # Keep the other sub-requests going if one of them fails
+            except Exception:
+                app.logger.exception('Batch sub-request failed.')
+                db.session.rollback()
+                return app.response_class(
+                    json.dumps({'error': 'Some problem occurred!'}),
+                    status=500, mimetype='application/json')
+    finally:
+        for name in ISOLATED_STATE:
+            g.pop(name, None)
+        for name, value in saved.items():
+            setattr(g, name, value)
+
+
+def _body(response):
+    '''Returns the json body of a sub-response, or its text'''
+    data = response.get_data()
+    if response.mimetype == 'application/json':
+        try:
+            return json.loads(data.decode('utf-8'))
+        except ValueError:
+            pass
+    return data.decode('utf-8', 'replace')
+
+
+def run_batch(sub_requests):
+    '''Runs the sub-requests in order with one identity decode
+
+    Arg {Array<Object>} sub_requests - method, path, body
+
+    Returns {Array<Object>} responses - status, headers, body
+            {Array<string>} cookies - Set-Cookie headers of the responses
+    '''
+    # Build every environ first so an invalid request runs nothing
+    environs = [_environ(sub_request) for sub_request in sub_requests]
+    batch_path = request.path
+
+    g.batch_jwt = {}
+    responses = []
+    cookies = []
+
+    # Cookies set by a sub-response, like the tokens of /login, are
+    # sent with the sub-requests after it
+    jar = _cookies(request.headers.get('Cookie'))
+
+    try:
+        for environ in environs:
+            if jar:
+                environ['HTTP_COOKIE'] = '; '.join(
+                    '%s=%s' % item for item in jar.items())
+            else:
+                environ.pop('HTTP_COOKIE', None)
+
+            if environ['PATH_INFO'] == batch_path:
+                responses.append({
+                    'status': 400,
+                    'headers': {},
+                    'body': {'error': 'Batches can not be nested!'},
+                })
+                continue
+
+            response = _dispatch(environ)
+
+            # Reading a streamed body would hold the whole stream in
+            # memory before the batch can answer
+            if response.is_streamed:
+                response.close()
+                responses.append({
+                    'status': 400,
+                    'headers': {},
+                    'body': {
+                        'error': 'Streaming responses can not be batched!'},
+                })
+                continue
+
+            set_cookies = response.headers.getlist('Set-Cookie')
+            cookies.extend(set_cookies)
+
+            # New credentials have to be decoded again
+            if _set_cookies(jar, set_cookies):
+                g.batch_jwt = {}
+            responses.append({
+                'status': response.status_code,
+                'headers': {
+                    name: response.headers[name] for name in RETURNED_HEADERS
+                    if name in response.headers
+                },
+                'body': _body(response),
+            })
+
+    finally:
+        g.pop('batch_jwt', None)
+
+    return responses, cookies
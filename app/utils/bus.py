@@ -0,0 +1,353 @@
+from app import db
+from flask_sqlalchemy import SignallingSession
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.pool import NullPool
+from threading import Thread, Lock
+from itertools import chain
+import json
+import os
+import select
+import socket
+import tempfile
+import uuid
+
+
+# PostgreSQL channel the invalidation messages are sent on
+PG_CHANNEL = 'pydino_invalidate'
+
+# Seconds the listener waits on the connection before polling again
+POLL_TIMEOUT = 5.0
+
+NOTIFY = text('SELECT pg_notify(:channel, :payload)')
+
+
+class PostgresTransport(object):
+    '''Sends the messages with NOTIFY in the committing transaction and
+    receives them on a LISTEN connection to the primary database, so
+    they reach every worker on every host. The LISTEN connection needs
+    a direct connection, so behind PgBouncer it uses
+    INVALIDATION_DATABASE_URI.'''
+
+    # Messages are sent with the transaction that wrote the tables
+    transactional = True
+
+    def __init__(self, app):
+        self.app = app
+        self.uri = app.config.get('INVALIDATION_DATABASE_URI')
+
+    def send(self, payload):
+        engine = db.get_engine(self.app)
+        with engine.connect() as connection:
+            connection.execution_options(autocommit=True).execute(
+                NOTIFY, channel=PG_CHANNEL, payload=payload)
+
+    def send_in(self, session, payload):
+        '''Queues the message in a session's transaction on the primary,
+        so PostgreSQL delivers it when the transaction commits without
+        another connection'''
+        session.execute(
+            NOTIFY, {'channel': PG_CHANNEL, 'payload': payload},
+            bind=db.get_engine(self.app))
+
+    def listen(self, receive, ready):
+        # Use a connection outside of the pool, since it stays open for
+        # the lifetime of the worker
+        if self.uri:
+            engine = create_engine(self.uri, poolclass=NullPool)
+            connection = engine.raw_connection()
+        else:
+            connection = db.get_engine(self.app).raw_connection()
+            connection.detach()
+        connection.connection.set_isolation_level(0)
+
+        cursor = connection.cursor()
+        cursor.execute('LISTEN %s' % PG_CHANNEL)
+        ready()
+
+        while True:
+            if select.select([connection.connection], [], [],
+                             POLL_TIMEOUT) == ([], [], []):
+                continue
+
+            connection.connection.poll()
+            while connection.connection.notifies:
+                notify = connection.connection.notifies.pop(0)
+                receive(notify.payload)
+
+
+class SocketTransport(object):
+    '''Sends the messages as datagrams to a UNIX socket per worker in
+    a shared directory, for the workers of a single host'''
+
+    def __init__(self, app):
+        self.app = app
+        self.directory = app.config.get('INVALIDATION_SOCKET_DIR') or \
+            os.path.join(tempfile.gettempdir(), 'pydino-bus')
+        self.path = None
+
+    def send(self, payload):
+        data = payload.encode('utf-8')
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+
+        # A full receive buffer raises instead of blocking the request
+        sock.setblocking(False)
+
+        try:
+            for name in os.listdir(self.directory):
+                path = os.path.join(self.directory, name)
+                if path == self.path:
+                    continue
+
+                try:
+                    sock.sendto(data, path)
+
+                # Remove the sockets of workers that exited
+                except (ConnectionRefusedError, FileNotFoundError):
+                    try:
+                        os.unlink(path)
+                    except OSError:
+                        pass
+
+                # Skip workers that are too far behind to receive
+                except BlockingIOError:
+                    pass
+
+                except OSError:
+                    self.app.logger.warning(
+                        'Could not send invalidation to %s.', path,
+                        exc_info=True)
+
+        except FileNotFoundError:
+            pass
+
+        finally:
+            sock.close()
+
+    def listen(self, receive, ready):
+        os.makedirs(self.directory, exist_ok=True)
+        self.path = os.path.join(self.directory, '%d.sock' % os.getpid())
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        sock.bind(self.path)
+        ready()
+
+        while True:
+            data = sock.recv(65536)
+            receive(data.decode('utf-8'))
+
+
+TRANSPORTS = {
+    'postgres': PostgresTransport,
+    'socket': SocketTransport,
+}
+
+
+class InvalidationBus(object):
+    '''Tells the app's subscribers, in this process and in every other
+    worker, which tables a committed transaction wrote to, so per-process
+    caches can drop their stale entries.
+
+        INVALIDATION_BUS {string} 'postgres' to use LISTEN/NOTIFY, 'socket'
+            to use UNIX sockets in INVALIDATION_SOCKET_DIR, or None to only
+            notify this process. Defaults to 'postgres' on PostgreSQL, or
+            behind PgBouncer to 'socket' unless INVALIDATION_DATABASE_URI
+            is set.
+        INVALIDATION_DATABASE_URI {string} direct, unpooled uri of the
+            primary for LISTEN, which doesn't work through PgBouncer
+        INVALIDATION_SOCKET_DIR {string} directory of the worker sockets
+    '''
+
+    def __init__(self, app):
+        self.app = app
+        self.subscribers = []
+        self.origin = None
+        self._pid = None
+        self._lock = Lock()
+
+        name = app.config.get('INVALIDATION_BUS', 'auto')
+        pgbouncer = app.config.get('SQLALCHEMY_PGBOUNCER') and \
+            not app.config.get('INVALIDATION_DATABASE_URI')
+        if name == 'auto':
+            uri = app.config.get('SQLALCHEMY_DATABASE_URI') or ''
+            if not uri.startswith('postgres'):
+                name = None
+            else:
+                name = 'socket' if pgbouncer else 'postgres'
+        elif name == 'postgres' and pgbouncer:
+            app.logger.warning(
+                'LISTEN does not work through PgBouncer, set '
+                'INVALIDATION_DATABASE_URI to a direct connection.')
+
+        self.transport = TRANSPORTS[name](app) if name else None
+
+        @app.before_request
+        def start_listener():
+            self.start()
+
+    def subscribe(self, func, local=True):
+        '''Calls func with the set of written table names after every
+        commit in another process, and in this process if local is True
+
+        Arg {func} func
+            {bool} local
+        '''
+        self.subscribers.append((func, local))
+
+    def start(self):
+        '''Starts the listener thread of this process, once per process
+        so workers forked from a preloaded app start their own'''
+        if self.transport is None or self._pid == os.getpid():
+            return
+
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+
+            self._pid = os.getpid()
+            self.origin = uuid.uuid4().hex
+            Thread(target=self._listen, daemon=True).start()
+
+    def _listen(self):
+        try:
+            self.transport.listen(self._receive, self._ready)
+        except Exception:
+            self.app.logger.exception('Invalidation bus listener stopped.')
+            self._pid = None
+
+    def _ready(self):
+        # Caches inherited from a preloaded master or filled before the
+        # listener was up may have missed writes, so drop all of them
+        self._notify(set(db.metadata.tables), remote=True)
+
+    def message(self, tables):
+        '''Returns the payload telling the other workers that tables
+        were written
+
+        Arg {Array<string>} tables
+
+        Returns {string} payload
+        '''
+        self.start()
+        return json.dumps({
+            'origin': self.origin,
+            'tables': sorted(tables),
+        })
+
+    def _receive(self, payload):
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            return
+
+        if message.get('origin') != self.origin:
+            self._notify(set(message.get('tables', ())), remote=True)
+
+    def _notify(self, tables, remote):
+        for func, local in self.subscribers:
+            if remote or local:
+                try:
+                    func(tables)
+                except Exception:
+                    self.app.logger.exception(
+                        'Invalidation bus subscriber failed.')
+
+    def publish(self, tables, send=True):
+        '''Notifies the subscribers of this process and every other
+        worker that tables were written
+
+        Arg {Array<string>} tables
+            {bool} send - False if the other workers were already sent
+                the message in the committed transaction
+        '''
+        tables = set(tables)
+        self._notify(tables, remote=False)
+
+        if self.transport is not None and send:
+            try:
+                self.transport.send(self.message(tables))
+            except Exception:
+                self.app.logger.exception(
+                    'Could not publish invalidation message.')
+
+
+def init_bus(app):
+    '''Adds an invalidation bus to the app
+
+    Arg {Flask} app
+    '''
+    app.extensions['bus'] = InvalidationBus(app)
+
+
+def _written(session):
+    '''Returns the set of tables written in a session's transaction'''
+    return session.info.setdefault('bus_tables', set())
+
+
+def mark_written(*tables):
+    '''Records tables written with core statements in the current
+    transaction, which the session can't see, so they are published
+    when it commits
+
+    Arg {Array<string>} tables
+    '''
+    _written(db.session()).update(tables)
+
+
+@event.listens_for(SignallingSession, 'after_flush')
+def _collect_flushed(session, flush_context):
+    tables = _written(session)
+    for obj in chain(session.new, session.dirty, session.deleted):
+        name = getattr(obj, '__tablename__', None)
+        if name is not None:
+            tables.add(name)
+
+        # Collections of many-to-many relationships, like User.roles,
+        # are written to their secondary tables
+        state = inspect(obj)
+        for relationship in state.mapper.relationships:
+            if relationship.secondary is None:
+                continue
+            if obj in session.deleted or \
+                    state.attrs[relationship.key].history.has_changes():
+                tables.add(relationship.secondary.name)
+
+
+@event.listens_for(SignallingSession, 'after_bulk_update')
+def _collect_bulk_update(update_context):
+    _written(update_context.session).add(update_context.primary_table.name)
+
+
+@event.listens_for(SignallingSession, 'after_bulk_delete')
+def _collect_bulk_delete(delete_context):
+    _written(delete_context.session).add(delete_context.primary_table.name)
+
+
+@event.listens_for(SignallingSession, 'before_commit')
+def _send_in_transaction(session):
+    bus = session.app.extensions.get('bus')
+    if bus is None or not getattr(bus.transport, 'transactional', False):
+        return
+
+    # Flush first, since the commit's own flush runs after this hook
+    session.flush()
+    tables = session.info.get('bus_tables')
+    if tables:
+        bus.transport.send_in(session, bus.message(tables))
+        session.info['bus_sent'] = True
+
+
+@event.listens_for(SignallingSession, 'after_commit')
+def _publish_committed(session):
+    tables = session.info.pop('bus_tables', None)
+    sent = session.info.pop('bus_sent', False)
+    bus = session.app.extensions.get('bus')
+    if tables and bus is not None:
+        bus.publish(tables, send=not sent)
+
+
+@event.listens_for(SignallingSession, 'after_rollback')
+def _forget_rolled_back(session):
+    session.info.pop('bus_tables', None)
+    session.info.pop('bus_sent', None)
@@ -0,0 +1,240 @@
+from flask import request, current_app
+from werkzeug.http import parse_etags, quote_etag
+from collections import OrderedDict
+from threading import Lock
+import hashlib
+import zlib
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+# Mimetypes worth compressing. Server-sent events are left out since
+# they must reach the client as soon as they are written
+MIMETYPES = frozenset([
+    'application/json', 'application/javascript', 'text/css', 'text/html',
+    'text/markdown', 'text/plain', 'image/svg+xml', 'application/msgpack',
+    'application/x-msgpack', 'application/vnd.pydino.columnar+json',
+    'application/vnd.pydino.columnar+msgpack',
+])
+
+# Encodings whose name is appended to the strong ETags they change
+ENCODINGS = ('br', 'gzip')
+
+
+class _GzipEncoder(object):
+    '''Incremental gzip encoder'''
+
+    def __init__(self, level):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def flush(self):
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush()
+
+
+class _BrotliEncoder(object):
+    '''Incremental brotli encoder'''
+
+    def __init__(self, level):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data):
+        return self._compressor.process(data)
+
+    def flush(self):
+        return self._compressor.flush()
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+class _Settings(object):
+    '''Compression settings and compressed body cache of one app'''
+
+    def __init__(self, app):
+        self.min_size = app.config.get('COMPRESS_MIN_SIZE', 500)
+        self.levels = {
+            'gzip': app.config.get('COMPRESS_GZIP_LEVEL', 6),
+            'br': app.config.get('COMPRESS_BR_LEVEL', 4),
+        }
+        self.cache_size = app.config.get('COMPRESS_CACHE_SIZE', 128)
+        self.cache = OrderedDict()
+        self.lock = Lock()
+
+    def encoder(self, encoding):
+        if encoding == 'br':
+            return _BrotliEncoder(self.levels['br'])
+        return _GzipEncoder(self.levels['gzip'])
+
+
+class Compress(object):
+    '''Compresses responses with brotli or gzip, whichever the client
+    prefers, if they are larger than a threshold. Streamed bodies are
+    compressed as they are generated, and the compressed bytes of
+    cacheable GET responses are kept so identical bodies are only
+    compressed once. Strong ETags get the encoding appended, which is
+    removed again from If-None-Match so the views can answer with 304.
+    The settings and the cache are kept per app.
+
+        COMPRESS_ENABLED {bool} compress responses, defaults to True
+        COMPRESS_MIN_SIZE {int} smallest body compressed, in bytes
+        COMPRESS_GZIP_LEVEL {int} gzip level, defaults to 6
+        COMPRESS_BR_LEVEL {int} brotli quality, defaults to 4
+        COMPRESS_CACHE_SIZE {int} number of compressed bodies kept
+    '''
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        if not app.config.get('COMPRESS_ENABLED', True):
+            return
+
+        app.extensions['compress'] = _Settings(app)
+
+        app.before_request(self._strip_etags)
+        app.after_request(self._compress)
+
+    def _strip_etags(self):
+        '''Adds the ETags of If-None-Match without their encoding, so
+        the views compare them with the ETags they set. The suffixed
+        ETags are kept for views that encode their own responses.'''
+        value = request.environ.get('HTTP_IF_NONE_MATCH')
+        if not value:
+            return
+
+        etags = parse_etags(value)
+        if etags.star_tag:
+            return
+
+        stripped = {}
+        for etag in etags.as_set():
+            name, _, encoding = etag.rpartition('-')
+            if name and encoding in ENCODINGS:
+                stripped[name] = etag
+        if not stripped:
+            return
+
+        request.environ['HTTP_IF_NONE_MATCH'] = '%s, %s' % (
+            value, ', '.join(quote_etag(etag) for etag in stripped))
+        request.environ['compress.etags'] = stripped
+
+    def _encoding(self):
+        '''Returns the best encoding the client accepts, or None'''
+        encodings = ['br', 'gzip'] if brotli is not None else ['gzip']
+        encoding = request.accept_encodings.best_match(encodings)
+        if encoding and request.accept_encodings[encoding] > 0:
+            return encoding
+        return None
+
+    def _cacheable(self, response):
+        '''Returns True if the compressed body may be reused'''
+        return (
+            request.method == 'GET' and
+            not response.cache_control.no_store and
+            not response.cache_control.private and
+            'Set-Cookie' not in response.headers
+        )
+
+    def _compress(self, response):
+        # A 304 tells the client its encoded copy is current, so it
+        # keeps the ETag the client sent
+        if response.status_code == 304:
+            etag, weak = response.get_etag()
+            etags = request.environ.get('compress.etags') or {}
+            if etag in etags and not weak:
+                response.set_etag(etags[etag])
+            return response
+
+        if (response.status_code < 200 or
+                response.status_code in (204, 206, 304) or
+                response.direct_passthrough or
+                'Content-Encoding' in response.headers or
+                response.mimetype not in MIMETYPES):
+            return response
+
+        response.vary.add('Accept-Encoding')
+
+        encoding = self._encoding()
+        if encoding is None:
+            return response
+
+        settings = current_app.extensions['compress']
+
+        # Compress streamed bodies as they are generated
+        if response.is_streamed:
+            response.response = self._stream(
+                response.response, settings.encoder(encoding))
+            self._set_encoding(response, encoding)
+            return response
+
+        body = response.get_data()
+        if len(body) < settings.min_size:
+            return response
+
+        if self._cacheable(response):
+            data = self._cached(settings, body, encoding)
+        else:
+            encoder = settings.encoder(encoding)
+            data = encoder.compress(body) + encoder.finish()
+
+        response.set_data(data)
+        self._set_encoding(response, encoding)
+        return response
+
+    def _stream(self, chunks, encoder):
+        '''Yields the compressed chunks of a streamed body, flushed
+        after every chunk so it reaches the client without waiting for
+        the next one. The body is generated after the app context is
+        gone, so the encoder is created beforehand.
+
+        Arg {Iterable<bytes>} chunks
+            {Object} encoder
+        '''
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            data = encoder.compress(chunk) + encoder.flush()
+            if data:
+                yield data
+        yield encoder.finish()
+
+    def _cached(self, settings, body, encoding):
+        '''Returns the compressed body, compressing it only if the same
+        body wasn't compressed recently'''
+        key = (hashlib.sha1(body).digest(), encoding)
+
+        with settings.lock:
+            data = settings.cache.get(key)
+            if data is not None:
+                settings.cache.move_to_end(key)
+                return data
+
+        encoder = settings.encoder(encoding)
+        data = encoder.compress(body) + encoder.finish()
+
+        with settings.lock:
+            settings.cache[key] = data
+            while len(settings.cache) > settings.cache_size:
+                settings.cache.popitem(last=False)
+
+        return data
+
+    def _set_encoding(self, response, encoding):
+        response.headers['Content-Encoding'] = encoding
+        if response.is_streamed:
+            response.headers.pop('Content-Length', None)
+
+        # Weak ETags stay valid, strong ones now describe other bytes
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag('%s-%s' % (etag, encoding))
@@ -0,0 +1,60 @@
+from flask import request
+from flask_cors.core import (
+    get_cors_options, get_app_kwarg_dict, set_cors_headers, ACL_ORIGIN)
+
+
+# Policy of every blueprint without its own policy. Browsers cap how
+# long they cache a preflight, Chrome at 2 hours
+DEFAULT_POLICY = {
+    'origins': '*',
+    'expose_headers': ['access', 'refresh'],
+    'supports_credentials': True,
+    'max_age': 7200,
+}
+
+
+class BlueprintCORS(object):
+    '''CORS headers with a policy per blueprint. Preflight requests are
+    answered before any other request hook, so they skip the token
+    checks and the views, and tell the browser to cache the result for
+    max_age seconds.
+
+        CORS_POLICIES {Object} flask_cors options by blueprint name,
+            merged over the default policy
+        CORS_* {Object} flask_cors options of every policy, e.g.
+            CORS_MAX_AGE
+    '''
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        # The CORS_* config overrides the default policy
+        base = dict(DEFAULT_POLICY, **get_app_kwarg_dict(app))
+
+        default = get_cors_options(app, base)
+        policies = {
+            name: get_cors_options(app, base, policy)
+            for name, policy in (
+                app.config.get('CORS_POLICIES') or {}).items()
+        }
+        app.extensions['cors_policies'] = (default, policies)
+
+        def policy():
+            return policies.get(request.blueprint, default)
+
+        def preflight():
+            if (request.method == 'OPTIONS' and
+                    'Access-Control-Request-Method' in request.headers):
+                response = app.response_class(status=200)
+                return set_cors_headers(response, policy())
+
+        def add_cors_headers(response):
+            if not response.headers.get(ACL_ORIGIN):
+                set_cors_headers(response, policy())
+            return response
+
+        # Run before the hooks the other extensions registered
+        app.before_request_funcs.setdefault(None, []).insert(0, preflight)
+        app.after_request(add_cors_headers)
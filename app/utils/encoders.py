@@ -0,0 +1,91 @@
+from flask.json import JSONEncoder
+from datetime import date, datetime, time
+from decimal import Decimal
+import uuid
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def json_default(o):
+    '''Converts the types neither encoder handles to json types. Dates
+    are sent in ISO 8601 and bytes, like READMEs, as utf-8 text.
+
+    Arg {Object} o
+
+    Returns {Object} value
+    '''
+    if isinstance(o, bytes):
+        return o.decode('utf-8', 'replace')
+    if isinstance(o, (datetime, date, time)):
+        return o.isoformat()
+    if isinstance(o, (uuid.UUID, Decimal)):
+        return str(o)
+    if hasattr(o, '__html__'):
+        return str(o.__html__())
+    raise TypeError('Object of type %s is not JSON serializable' % (
+        type(o).__name__))
+
+
+class StdlibJSONEncoder(JSONEncoder):
+    '''Flask's encoder with ISO 8601 dates and utf-8 bytes'''
+
+    def default(self, o):
+        try:
+            return json_default(o)
+        except TypeError:
+            return JSONEncoder.default(self, o)
+
+
+class OrjsonEncoder(StdlibJSONEncoder):
+    '''Encodes with orjson, which handles dates natively and is several
+    times faster on the large nested schema outputs. Falls back to the
+    stdlib for the options orjson doesn't support.'''
+
+    def encode(self, o):
+        # orjson only indents by two spaces, and ignores the separators
+        # since they only change whitespace
+        if self.indent not in (None, 2):
+            return super(OrjsonEncoder, self).encode(o)
+
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if self.indent:
+            option |= orjson.OPT_INDENT_2
+
+        try:
+            return orjson.dumps(
+                o, default=json_default, option=option).decode()
+
+        # Keys orjson can't sort, like mixed types, or integers too big
+        except TypeError:
+            return super(OrjsonEncoder, self).encode(o)
+
+
+ENCODERS = {
+    'stdlib': StdlibJSONEncoder,
+    'orjson': OrjsonEncoder,
+}
+
+
+def init_json(app):
+    '''Sets the app's json encoder, which jsonify uses for every
+    response.
+
+        JSON_BACKEND {string} 'orjson', 'stdlib', or 'auto' to use orjson
+            if it is installed
+
+    Arg {Flask} app
+    '''
+    backend = app.config.get('JSON_BACKEND', 'auto')
+    if backend == 'auto':
+        backend = 'orjson' if orjson is not None else 'stdlib'
+
+    if backend == 'orjson' and orjson is None:
+        app.logger.warning('orjson is not installed, using the stdlib.')
+        backend = 'stdlib'
+
+    app.json_encoder = ENCODERS[backend]
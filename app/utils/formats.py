@@ -0,0 +1,96 @@
+from flask import request, current_app, jsonify as json_response
+from app.utils.encoders import json_default
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+JSON = 'application/json'
+MSGPACK = 'application/msgpack'
+MSGPACK_LEGACY = 'application/x-msgpack'
+COLUMNAR_JSON = 'application/vnd.pydino.columnar+json'
+COLUMNAR_MSGPACK = 'application/vnd.pydino.columnar+msgpack'
+
+
+def _formats():
+    '''Returns the mimetypes that can be sent, in order of preference
+    when the client accepts several equally'''
+    if msgpack is None:
+        return [JSON, COLUMNAR_JSON]
+    return [JSON, MSGPACK, MSGPACK_LEGACY, COLUMNAR_MSGPACK, COLUMNAR_JSON]
+
+
+def _columns(rows):
+    '''Turns a list of objects into its columns, or returns the list
+    unchanged if it isn't a list of objects
+
+    Arg {Array<Object>} rows
+
+    Returns {Object} table - columns: names of the columns
+                             values: list of each column's values
+    '''
+    if not rows or not all(isinstance(row, dict) for row in rows):
+        return rows
+
+    columns = []
+    for row in rows:
+        for column in row:
+            if column not in columns:
+                columns.append(column)
+
+    return {
+        'columns': columns,
+        'values': [[row.get(column) for row in rows] for column in columns],
+    }
+
+
+def columnar(data):
+    '''Stores the lists of objects in a response column by column, so
+    a list of brackets becomes one array per bracket slot
+
+    Arg {Object} data
+
+    Returns {Object} data
+    '''
+    if isinstance(data, list):
+        return _columns(data)
+    if isinstance(data, dict):
+        return {key: _columns(value) if isinstance(value, list) else value
+                for key, value in data.items()}
+    return data
+
+
+def jsonify(*args, **kwargs):
+    '''Drop-in for flask.jsonify that sends MessagePack, or the
+    columnar layout as json or MessagePack, if the Accept header
+    prefers it. Json stays the default.
+
+    Returns {Response} response
+    '''
+    mimetype = request.accept_mimetypes.best_match(_formats(), default=JSON)
+
+    if mimetype == JSON:
+        response = json_response(*args, **kwargs)
+        response.vary.add('Accept')
+        return response
+
+    if args and kwargs:
+        raise TypeError('jsonify() behavior undefined when passed both '
+                        'args and kwargs')
+    data = args[0] if len(args) == 1 else (args or kwargs)
+
+    if mimetype in (COLUMNAR_JSON, COLUMNAR_MSGPACK):
+        data = columnar(data)
+
+    if mimetype == COLUMNAR_JSON:
+        response = json_response(data)
+        response.mimetype = COLUMNAR_JSON
+    else:
+        response = current_app.response_class(
+            msgpack.packb(data, default=json_default, use_bin_type=True),
+            mimetype=mimetype)
+
+    response.vary.add('Accept')
+    return response
@@ -0,0 +1,19 @@
+from werkzeug.utils import import_string, cached_property
+
+
+class LazyView(object):
+    '''View function that imports the real view on its first request
+
+    Arg {string} import_name - dotted path of the view function
+    '''
+
+    def __init__(self, import_name):
+        self.__module__, self.__name__ = import_name.rsplit('.', 1)
+        self.import_name = import_name
+
+    @cached_property
+    def view(self):
+        return import_string(self.import_name)
+
+    def __call__(self, *args, **kwargs):
+        return self.view(*args, **kwargs)
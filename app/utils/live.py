@@ -0,0 +1,31 @@
+from app import db
+from app.models import Match
+import json
+
+
+def match_scores():
+    '''Returns the teams and scores of every match
+
+    Returns {Array<Object>} scores
+    '''
+    rows = db.session.query(
+        Match.id, Match.match, Match.team1_id, Match.team2_id,
+        Match.team1_score, Match.team2_score
+    ).order_by(Match.match).all()
+
+    return [row._asdict() for row in rows]
+
+
+def sse_event(data, event='scores'):
+    '''Formats data as a server-sent event
+
+    Arg {Object} data
+        {string} event
+
+    Returns {string} event
+    '''
+    return 'event: %s\ndata: %s\n\n' % (event, json.dumps(data))
+
+
+# Comment line that keeps idle connections open
+SSE_KEEPALIVE = ': keepalive\n\n'
@@ -0,0 +1,234 @@
+from flask import g, request, has_request_context, current_app, Response
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from threading import Lock
+from time import perf_counter
+
+
+# Blueprints whose requests are measured
+BLUEPRINTS = ('api', 'auth', 'mail')
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+                   10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 250, 1000)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+class Histogram(object):
+    '''Cumulative histogram in the Prometheus format'''
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+
+    def lines(self, name, labels):
+        for bound, count in zip(self.buckets, self.counts):
+            yield '%s_bucket{%s,le="%s"} %d' % (name, labels, bound, count)
+        yield '%s_bucket{%s,le="+Inf"} %d' % (name, labels, self.count)
+        yield '%s_sum{%s} %s' % (name, labels, self.sum)
+        yield '%s_count{%s} %d' % (name, labels, self.count)
+
+
+class EndpointMetrics(object):
+    '''Metrics recorded for one endpoint and method'''
+
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.queries = Histogram(QUERY_BUCKETS)
+        self.query_seconds = 0.0
+        self.serialization_seconds = 0.0
+        self.response_size = Histogram(SIZE_BUCKETS)
+        self.statuses = {}
+
+
+class Metrics(object):
+    '''Opt-in per-request instrumentation of the api, auth and mail
+    blueprints, exposed in the Prometheus text format.
+
+        METRICS_ENABLED {bool} record metrics and serve them
+        METRICS_PATH {string} url of the metrics, defaults to /metrics
+    '''
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        if not app.config.get('METRICS_ENABLED'):
+            return
+
+        # Each app records its own metrics
+        app.extensions['metrics'] = {'endpoints': {}, 'lock': Lock()}
+
+        app.before_request(self._start)
+        app.after_request(self._finish)
+        app.add_url_rule(
+            app.config.get('METRICS_PATH', '/metrics'), 'metrics',
+            self.view, methods=['GET'])
+
+        if not event.contains(
+                Engine, 'before_cursor_execute', _before_cursor_execute):
+            event.listen(
+                Engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(
+                Engine, 'after_cursor_execute', _after_cursor_execute)
+            event.listen(Engine, 'handle_error', _handle_error)
+
+    def _start(self):
+        if request.blueprint in BLUEPRINTS:
+            g.metrics = {
+                'start': perf_counter(),
+                'queries': 0,
+                'query_seconds': 0.0,
+                'serialization_seconds': 0.0,
+            }
+
+    def _finish(self, response):
+        current = g.pop('metrics', None)
+        if current is None:
+            return response
+
+        elapsed = perf_counter() - current['start']
+        size = response.calculate_content_length() or 0
+        key = (request.endpoint, request.method)
+        recorded = current_app.extensions['metrics']
+
+        with recorded['lock']:
+            metrics = recorded['endpoints'].get(key)
+            if metrics is None:
+                metrics = recorded['endpoints'][key] = EndpointMetrics()
+
+            metrics.latency.observe(elapsed)
+            metrics.queries.observe(current['queries'])
+            metrics.query_seconds += current['query_seconds']
+            metrics.serialization_seconds += current['serialization_seconds']
+            metrics.response_size.observe(size)
+            metrics.statuses[response.status_code] = (
+                metrics.statuses.get(response.status_code, 0) + 1)
+
+        return response
+
+    def render(self):
+        '''Returns the recorded metrics in the Prometheus text format,
+        with the samples of each metric after its own HELP and TYPE'''
+        families = [
+            ('http_request_duration_seconds', 'histogram',
+             'Request latency in seconds.'),
+            ('http_requests_total', 'counter',
+             'Requests by response status.'),
+            ('db_queries_per_request', 'histogram',
+             'SQL queries run by a request.'),
+            ('db_query_duration_seconds_total', 'counter',
+             'Seconds spent running SQL queries.'),
+            ('serialization_duration_seconds_total', 'counter',
+             'Seconds spent in marshmallow dumps.'),
+            ('http_response_size_bytes', 'histogram',
+             'Response body size in bytes.'),
+        ]
+        samples = {name: [] for name, _, _ in families}
+        recorded = current_app.extensions['metrics']
+
+        with recorded['lock']:
+            for (endpoint, method), metrics in sorted(
+                    recorded['endpoints'].items()):
+                labels = 'endpoint="%s",method="%s"' % (endpoint, method)
+                samples['http_request_duration_seconds'].extend(
+                    metrics.latency.lines(
+                        'http_request_duration_seconds', labels))
+                for status, count in sorted(metrics.statuses.items()):
+                    samples['http_requests_total'].append(
+                        'http_requests_total{%s,status="%d"} %d' % (
+                            labels, status, count))
+                samples['db_queries_per_request'].extend(
+                    metrics.queries.lines('db_queries_per_request', labels))
+                samples['db_query_duration_seconds_total'].append(
+                    'db_query_duration_seconds_total{%s} %s' % (
+                        labels, metrics.query_seconds))
+                samples['serialization_duration_seconds_total'].append(
+                    'serialization_duration_seconds_total{%s} %s' % (
+                        labels, metrics.serialization_seconds))
+                samples['http_response_size_bytes'].extend(
+                    metrics.response_size.lines(
+                        'http_response_size_bytes', labels))
+
+        lines = []
+        for name, kind, description in families:
+            lines.append('# HELP %s %s' % (name, description))
+            lines.append('# TYPE %s %s' % (name, kind))
+            lines.extend(samples[name])
+
+        return '\n'.join(lines) + '\n'
+
+    def view(self):
+        return Response(
+            self.render(), mimetype='text/plain; version=0.0.4')
+
+
+def _current():
+    '''Returns the metrics of the current request, if it is measured'''
+    if has_request_context():
+        return g.get('metrics')
+    return None
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context,
+                           executemany):
+    conn.info.setdefault('query_start', []).append(perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context,
+                          executemany):
+    start = conn.info['query_start'].pop()
+    current = _current()
+    if current is not None:
+        current['queries'] += 1
+        current['query_seconds'] += perf_counter() - start
+
+
+def _handle_error(exception_context):
+    '''Drops the start time of a query that failed, which
+    after_cursor_execute never sees'''
+    connection = exception_context.connection
+    if connection is not None and connection.info.get('query_start'):
+        connection.info['query_start'].pop()
+
+
+def timed_schema(schema_class):
+    '''Returns a subclass of a schema class that adds the time spent
+    in its dumps to the request metrics. Only schemas derived from it
+    are timed, marshmallow itself is left alone.
+
+    Arg {class} schema_class
+
+    Returns {class} schema_class
+    '''
+    dump = schema_class.dump
+
+    def timed_dump(self, *args, **kwargs):
+        current = _current()
+        if current is None:
+            return dump(self, *args, **kwargs)
+
+        # Nested schemas are timed as part of their parent
+        depth = current.get('dump_depth', 0)
+        current['dump_depth'] = depth + 1
+        start = perf_counter()
+        try:
+            return dump(self, *args, **kwargs)
+        finally:
+            current['dump_depth'] = depth
+            if depth == 0:
+                current['serialization_seconds'] += perf_counter() - start
+
+    return type(schema_class)(
+        'Timed%s' % schema_class.__name__, (schema_class,),
+        {'dump': timed_dump, '__module__': __name__})
@@ -0,0 +1,148 @@
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.pool import Pool, QueuePool, NullPool
+from threading import Lock
+from time import perf_counter
+
+
+_lock = Lock()
+_stats = {
+    'connects': 0,
+    'checkouts': 0,
+    'checkins': 0,
+    'invalidated': 0,
+    'waits': 0,
+    'wait_seconds': 0.0,
+    'max_wait_seconds': 0.0,
+}
+
+
+def _incr(key, value=1):
+    '''Adds value to a pool stats counter'''
+    with _lock:
+        _stats[key] += value
+
+
+class TimedQueuePool(QueuePool):
+    '''QueuePool that records how long each checkout waited for a free
+    connection'''
+
+    def _do_get(self):
+        # Only checkouts that found no free connection and no room to
+        # open one have to wait
+        waits = (
+            self.checkedin() == 0 and self._max_overflow > -1 and
+            self.overflow() >= self._max_overflow)
+        start = perf_counter()
+        try:
+            return super(TimedQueuePool, self)._do_get()
+        finally:
+            if waits:
+                elapsed = perf_counter() - start
+                with _lock:
+                    _stats['waits'] += 1
+                    _stats['wait_seconds'] += elapsed
+                    if elapsed > _stats['max_wait_seconds']:
+                        _stats['max_wait_seconds'] = elapsed
+
+
+@event.listens_for(Pool, 'connect')
+def _on_connect(dbapi_connection, connection_record):
+    _incr('connects')
+
+
+@event.listens_for(Pool, 'checkout')
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    _incr('checkouts')
+
+
+@event.listens_for(Pool, 'checkin')
+def _on_checkin(dbapi_connection, connection_record):
+    _incr('checkins')
+
+
+@event.listens_for(Pool, 'invalidate')
+def _on_invalidate(dbapi_connection, connection_record, exception):
+    _incr('invalidated')
+
+
+class PooledSQLAlchemy(SQLAlchemy):
+    '''Flask-SQLAlchemy extension with configurable connection pooling.
+
+    Besides the SQLALCHEMY_POOL_* settings Flask-SQLAlchemy already
+    reads, it supports:
+
+        SQLALCHEMY_POOL_PRE_PING {bool} test connections on checkout
+        SQLALCHEMY_STATEMENT_TIMEOUT {int} statement timeout in ms
+        SQLALCHEMY_PGBOUNCER {bool} leave pooling to PgBouncer running
+            in transaction pooling mode
+    '''
+
+    def apply_driver_hacks(self, app, info, options):
+        super(PooledSQLAlchemy, self).apply_driver_hacks(app, info, options)
+
+        # SQLite pooling is already handled by Flask-SQLAlchemy
+        if info.drivername.startswith('sqlite'):
+            return
+
+        statement_timeout = app.config.get('SQLALCHEMY_STATEMENT_TIMEOUT')
+        postgres = info.drivername.startswith('postgres')
+
+        # In transaction pooling mode every transaction may run on a
+        # different server connection, so don't hold connections here
+        # and only use transaction scoped settings
+        if app.config.get('SQLALCHEMY_PGBOUNCER'):
+            for key in ('pool_size', 'max_overflow', 'pool_timeout',
+                        'pool_recycle'):
+                options.pop(key, None)
+            options['poolclass'] = NullPool
+
+            if statement_timeout and postgres:
+                self._set_local_statement_timeout(statement_timeout)
+            return
+
+        # Connections reused from the pool may have been closed by the
+        # server. A NullPool connection is always new, so it isn't pinged
+        options['pool_pre_ping'] = app.config.get(
+            'SQLALCHEMY_POOL_PRE_PING', True)
+        options['poolclass'] = TimedQueuePool
+        options.setdefault('pool_size', 10)
+        options.setdefault('max_overflow', 20)
+        options.setdefault('pool_recycle', 1800)
+
+        if statement_timeout and postgres:
+            connect_args = options.setdefault('connect_args', {})
+            connect_args['options'] = (
+                '-c statement_timeout=%d' % int(statement_timeout))
+
+    def _set_local_statement_timeout(self, statement_timeout):
+        '''Sets the statement timeout at the start of every transaction'''
+        if getattr(self, '_statement_timeout_set', False):
+            return
+        self._statement_timeout_set = True
+        sql = 'SET LOCAL statement_timeout = %d' % int(statement_timeout)
+
+        @event.listens_for(self.session, 'after_begin')
+        def set_statement_timeout(session, transaction, connection):
+            connection.execute(sql)
+
+
+def get_pool_stats(engine):
+    '''Returns the pool counters and the current state of the pool
+
+    Arg {Engine} engine
+
+    Returns {Object} pool stats
+    '''
+    with _lock:
+        stats = dict(_stats)
+
+    pool = engine.pool
+    stats['pool'] = pool.__class__.__name__
+    if isinstance(pool, QueuePool):
+        stats['size'] = pool.size()
+        stats['checked_in'] = pool.checkedin()
+        stats['checked_out'] = pool.checkedout()
+        stats['overflow'] = pool.overflow()
+
+    return stats
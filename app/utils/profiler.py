@@ -0,0 +1,216 @@
+from flask import g, request, has_request_context, current_app
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from collections import Counter
+from datetime import datetime
+from threading import Event, Lock, Thread, get_ident
+from time import perf_counter
+import cProfile
+import hmac
+import json
+import os
+import sys
+import uuid
+
+
+MODES = ('cprofile', 'sample')
+
+
+class Sampler(Thread):
+    '''Samples the stack of one thread at a fixed interval and counts
+    the collapsed stacks, as used by flamegraph tools'''
+
+    def __init__(self, thread_id, interval):
+        super(Sampler, self).__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop_event = Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append('%s:%s:%d' % (
+                    os.path.basename(code.co_filename), code.co_name,
+                    code.co_firstlineno))
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+    def collapsed(self):
+        return ''.join(
+            '%s %d\n' % (stack, count) for stack, count in self.stacks.items())
+
+
+class Profiler(object):
+    '''Profiles individual requests on demand and stores the profile
+    with the request's SQL statements for download.
+
+    A request is profiled if it sends an X-Profile-Token header equal to
+    PROFILER_TOKEN, or if an admin armed its endpoint with arm(). The
+    X-Profile header picks cprofile (the default) or sample mode.
+
+        PROFILER_TOKEN {string} secret enabling the X-Profile-Token header
+        PROFILER_DIR {string} directory the profiles are stored in
+        PROFILER_SAMPLE_INTERVAL {float} seconds between stack samples
+    '''
+
+    def __init__(self, app=None):
+        self._lock = Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        # Endpoints armed in each app, with their count and mode
+        app.extensions['profiler'] = {'armed': {}}
+
+        app.before_request(self._start)
+        app.after_request(self._finish)
+
+        if not event.contains(
+                Engine, 'before_cursor_execute', _before_cursor_execute):
+            event.listen(
+                Engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(
+                Engine, 'after_cursor_execute', _after_cursor_execute)
+
+    @property
+    def directory(self):
+        '''Directory the current app's profiles are stored in'''
+        return current_app.config.get(
+            'PROFILER_DIR',
+            os.path.join(current_app.instance_path, 'profiles'))
+
+    def arm(self, endpoint, count=1, mode='cprofile'):
+        '''Profiles the next count requests to endpoint in this process'''
+        with self._lock:
+            self.armed[endpoint] = (count, mode)
+
+    @property
+    def armed(self):
+        '''Endpoints armed in the current app'''
+        return current_app.extensions['profiler']['armed']
+
+    def _requested_mode(self):
+        '''Returns the profiling mode of the current request, or None'''
+        secret = current_app.config.get('PROFILER_TOKEN')
+        token = request.headers.get('X-Profile-Token')
+        if secret and token and hmac.compare_digest(token, secret):
+            mode = request.headers.get('X-Profile', 'cprofile')
+            return mode if mode in MODES else 'cprofile'
+
+        with self._lock:
+            count, mode = self.armed.get(request.endpoint, (0, None))
+            if not count:
+                return None
+            if count > 1:
+                self.armed[request.endpoint] = (count - 1, mode)
+            else:
+                del self.armed[request.endpoint]
+            return mode
+
+    def _start(self):
+        mode = self._requested_mode()
+        if mode is None:
+            return
+
+        current = {'mode': mode, 'sql': [], 'start': perf_counter()}
+        if mode == 'sample':
+            current['sampler'] = Sampler(
+                get_ident(),
+                current_app.config.get('PROFILER_SAMPLE_INTERVAL', 0.005))
+            current['sampler'].start()
+        else:
+            profile = cProfile.Profile()
+            # Another profiler may already be active in this process
+            try:
+                profile.enable()
+            except ValueError:
+                return
+            current['profile'] = profile
+
+        g.profile = current
+
+    def _finish(self, response):
+        current = g.pop('profile', None)
+        if current is None:
+            return response
+
+        if 'profile' in current:
+            current['profile'].disable()
+        else:
+            current['sampler'].stop()
+        duration = perf_counter() - current['start']
+
+        profile_id = '%s-%s' % (
+            datetime.utcnow().strftime('%Y%m%d%H%M%S'), uuid.uuid4().hex[:8])
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, profile_id)
+
+        if 'profile' in current:
+            current['profile'].dump_stats(path + '.pstats')
+        else:
+            with open(path + '.collapsed', 'w') as f:
+                f.write(current['sampler'].collapsed())
+
+        with open(path + '.json', 'w') as f:
+            json.dump({
+                'id': profile_id,
+                'mode': current['mode'],
+                'endpoint': request.endpoint,
+                'method': request.method,
+                'path': request.full_path,
+                'status': response.status_code,
+                'duration': duration,
+                'created_at': datetime.utcnow().isoformat(),
+                'sql': current['sql'],
+            }, f, indent=2)
+
+        response.headers['X-Profile-Id'] = profile_id
+        return response
+
+    def list_profiles(self):
+        '''Returns the metadata of the stored profiles, newest first'''
+        if not os.path.isdir(self.directory):
+            return []
+
+        profiles = []
+        for filename in sorted(os.listdir(self.directory), reverse=True):
+            if filename.endswith('.json'):
+                with open(os.path.join(self.directory, filename)) as f:
+                    profile = json.load(f)
+                profile['num_queries'] = len(profile.pop('sql'))
+                profiles.append(profile)
+
+        return profiles
+
+
+def _current():
+    '''Returns the profile of the current request, if it is profiled'''
+    if has_request_context():
+        return g.get('profile')
+    return None
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context,
+                           executemany):
+    if _current() is not None:
+        conn.info.setdefault('profile_start', []).append(perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context,
+                          executemany):
+    current = _current()
+    if current is not None and conn.info.get('profile_start'):
+        start = conn.info['profile_start'].pop()
+        current['sql'].append({
+            'statement': statement,
+            'duration': perf_counter() - start,
+        })
@@ -0,0 +1,46 @@
+from contextlib import contextmanager
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+@contextmanager
+def count_queries():
+    '''Counts the SQL statements executed on any engine inside the block
+
+    Yields {Object} counter
+            count: {int}
+            statements: {Array<string>}
+    '''
+    counter = {'count': 0, 'statements': []}
+
+    def before_cursor_execute(conn, cursor, statement, parameters,
+                              context, executemany):
+        counter['count'] += 1
+        counter['statements'].append(statement)
+
+    event.listen(Engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(Engine, 'before_cursor_execute', before_cursor_execute)
+
+
+@contextmanager
+def assert_max_queries(limit):
+    '''Fails if the block executes more than limit SQL statements.
+
+    Usage:
+        with assert_max_queries(3):
+            client.get('/api/v1/user')
+
+    Arg {int} limit
+
+    Raises {AssertionError} if more than limit statements ran
+    '''
+    with count_queries() as counter:
+        yield counter
+
+    if counter['count'] > limit:
+        raise AssertionError(
+            'Expected at most %d queries, got %d:\n%s' % (
+                limit, counter['count'], '\n'.join(counter['statements'])))
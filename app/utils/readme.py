@@ -0,0 +1,41 @@
+from hashlib import sha256
+import bleach
+import markdown
+
+
+# Markup allowed in rendered READMEs, everything else is escaped
+ALLOWED_TAGS = bleach.sanitizer.ALLOWED_TAGS + [
+    'p', 'pre', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'hr', 'br', 'img',
+    'table', 'thead', 'tbody', 'tr', 'th', 'td', 'del', 'dl', 'dt', 'dd',
+]
+ALLOWED_ATTRIBUTES = dict(bleach.sanitizer.ALLOWED_ATTRIBUTES)
+ALLOWED_ATTRIBUTES.update({
+    'img': ['src', 'alt', 'title'],
+    'code': ['class'],
+    'th': ['align'],
+    'td': ['align'],
+})
+
+
+def readme_hash(read_me):
+    '''Returns the content hash of a README
+
+    Arg {bytes} read_me
+
+    Returns {string} hash
+    '''
+    return sha256(read_me or b'').hexdigest()
+
+
+def render_readme(read_me):
+    '''Renders a markdown README to sanitized html
+
+    Arg {bytes} read_me
+
+    Returns {string} html
+    '''
+    text = (read_me or b'').decode('utf-8', 'replace')
+    html = markdown.markdown(text, extensions=['fenced_code', 'tables'])
+
+    return bleach.clean(
+        html, tags=ALLOWED_TAGS, attributes=ALLOWED_ATTRIBUTES, strip=True)
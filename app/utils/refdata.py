@@ -0,0 +1,159 @@
+from app.models import Team, Role, Topic, TeamSummarySchema, TopicSchema
+from flask import current_app
+from threading import Lock
+from app.utils.routing import on_primary
+from app.utils.warmup import register_warm_up
+
+
+def _load_teams():
+    '''Returns the team summaries by id'''
+    team_schema = TeamSummarySchema()
+    return {team.id: team_schema.dump(team).data for team in Team.query}
+
+
+def _load_roles():
+    '''Returns the role names by id'''
+    return {role.id: role.name for role in Role.query}
+
+
+def _load_topics():
+    '''Returns the topics by id'''
+    topic_schema = TopicSchema(exclude=('project',))
+    return {topic.id: topic_schema.dump(topic).data for topic in Topic.query}
+
+
+# Loader of each cached table, by table name
+LOADERS = {
+    'team': _load_teams,
+    'role': _load_roles,
+    'topic': _load_topics,
+}
+
+
+class ReferenceData(object):
+    '''Versioned in-process copy of the small, almost static team, role
+    and topic tables. A commit in any worker that writes to one of them
+    bumps the version and the table is reloaded on its next use.'''
+
+    def __init__(self):
+        self.version = 0
+        self._versions = dict.fromkeys(LOADERS, 0)
+        self._tables = {}
+        self._lock = Lock()
+
+    def _fresh(self, name):
+        '''Returns the rows of a table if they are current, or None'''
+        loaded, rows = self._tables.get(name, (None, None))
+        if loaded == self._versions[name]:
+            return rows
+        return None
+
+    def get(self, name):
+        '''Returns the rows of a cached table by id, loading it if it
+        changed since it was last loaded. Readers of a table that isn't
+        loaded yet wait for the thread loading it.
+
+        Arg {string} name
+
+        Returns {Object} rows
+        '''
+        rows = self._fresh(name)
+        if rows is not None:
+            return rows
+
+        with self._lock:
+            rows = self._fresh(name)
+            if rows is not None:
+                return rows
+
+            # Store the rows with the version from before the load, so
+            # a write committed during the load makes them stale again.
+            # Load from the primary, since a lagging replica's rows
+            # would be kept until the next write
+            version = self._versions[name]
+            with on_primary():
+                rows = LOADERS[name]()
+            self._tables[name] = (version, rows)
+
+        return rows
+
+    def load(self):
+        '''Loads every cached table'''
+        for name in LOADERS:
+            self.get(name)
+
+    def invalidate(self, names=None):
+        '''Marks cached tables stale, all of them if names is None
+
+        Arg {Array<string>} names
+        '''
+        names = set(LOADERS if names is None else names) & set(LOADERS)
+        if names:
+            self.version += 1
+            for name in names:
+                self._versions[name] += 1
+
+
+def init_refdata(app):
+    '''Adds a reference data cache to the app, loaded on warm up and
+    invalidated by the app's invalidation bus
+
+    Arg {Flask} app
+    '''
+    refdata = app.extensions['refdata'] = ReferenceData()
+    app.extensions['bus'].subscribe(refdata.invalidate)
+    register_warm_up(app, refdata.load)
+
+
+def reference(name):
+    '''Returns the rows of a cached table of the current app by id
+
+    Arg {string} name
+
+    Returns {Object} rows
+    '''
+    return current_app.extensions['refdata'].get(name)
+
+
+def role_names(role_ids):
+    '''Returns the names of the given role ids
+
+    Arg {Array<int>} role_ids
+
+    Returns {Array<string>} names
+    '''
+    roles = reference('role')
+    return [roles[role_id] for role_id in role_ids if role_id in roles]
+
+
+def topic_ids(names):
+    '''Returns the ids of the topics with the given names, or None if
+    any of the names is not a topic
+
+    Arg {Array<string>} names
+
+    Returns {Array<int>} ids
+    '''
+    ids = {topic['name']: id for id, topic in reference('topic').items()}
+    if any(name not in ids for name in names):
+        return None
+    return [ids[name] for name in names]
+
+
+def missing_ids(name, ids):
+    '''Returns the ids that aren't in a cached table
+
+    Arg {string} name
+        {Array<int>} ids
+
+    Returns {Array<int>} missing
+    '''
+    rows = reference(name)
+    missing = []
+    for id in ids:
+        try:
+            if int(id) not in rows:
+                missing.append(id)
+        except (TypeError, ValueError):
+            missing.append(id)
+    return missing
@@ -0,0 +1,186 @@
+from flask import g, request, has_request_context
+from contextlib import contextmanager
+from flask_sqlalchemy import SignallingSession
+from sqlalchemy import event, orm
+from sqlalchemy.exc import SQLAlchemyError
+from threading import Lock
+from time import time
+from app.utils.pool import PooledSQLAlchemy
+
+
+# Requests with these methods may be served by a replica
+READ_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# Cookie that pins a client's reads to the primary after a write
+PRIMARY_COOKIE = 'read_primary'
+
+# Query returning the replication lag of a PostgreSQL replica in seconds
+PG_LAG_QUERY = (
+    'SELECT COALESCE(EXTRACT(EPOCH FROM '
+    'now() - pg_last_xact_replay_timestamp()), 0)')
+
+
+class ReplicaSet(object):
+    '''Keeps track of the read replicas, their replication lag and
+    which of them are currently healthy enough to serve reads'''
+
+    def __init__(self, db):
+        self.db = db
+        self.keys = []
+        self.lag = {}
+        self.checked_at = {}
+        self.healthy = {}
+        self._next = 0
+        self._lock = Lock()
+
+    def init_app(self, app):
+        '''Registers each SQLALCHEMY_REPLICA_URIS entry as a bind'''
+        uris = app.config.get('SQLALCHEMY_REPLICA_URIS') or []
+        binds = dict(app.config.get('SQLALCHEMY_BINDS') or {})
+
+        self.keys = []
+        for index, uri in enumerate(uris):
+            key = 'replica_%d' % index
+            binds[key] = uri
+            self.keys.append(key)
+            self.healthy[key] = True
+
+        app.config['SQLALCHEMY_BINDS'] = binds or None
+        self.max_lag = app.config.get('SQLALCHEMY_REPLICA_MAX_LAG', 1.0)
+        self.check_interval = app.config.get(
+            'SQLALCHEMY_REPLICA_CHECK_INTERVAL', 5.0)
+
+    def check(self, app, key):
+        '''Measures the replication lag of a replica and marks it
+        unhealthy if it is too far behind or can't be reached'''
+        engine = self.db.get_engine(app, bind=key)
+
+        try:
+            if engine.dialect.name == 'postgresql':
+                lag = float(engine.scalar(PG_LAG_QUERY))
+            else:
+                engine.scalar('SELECT 1')
+                lag = 0.0
+
+        except SQLAlchemyError:
+            lag = None
+
+        self.lag[key] = lag
+        self.checked_at[key] = time()
+        self.healthy[key] = lag is not None and lag <= self.max_lag
+
+    def pick(self, app):
+        '''Returns the engine of the next healthy replica, or None if
+        no replica can serve reads'''
+        now = time()
+
+        for _ in range(len(self.keys)):
+            with self._lock:
+                key = self.keys[self._next % len(self.keys)]
+                self._next += 1
+
+            if now - self.checked_at.get(key, 0) > self.check_interval:
+                self.check(app, key)
+
+            if self.healthy[key]:
+                return self.db.get_engine(app, bind=key)
+
+        return None
+
+    def status(self):
+        '''Returns the lag and health of every replica'''
+        return {
+            key: {'lag': self.lag.get(key), 'healthy': self.healthy[key]}
+            for key in self.keys
+        }
+
+
+def use_primary():
+    '''Sends the rest of the current request's queries to the primary'''
+    g.db_use_primary = True
+
+
+@contextmanager
+def on_primary():
+    '''Sends the queries inside the block to the primary, for caches
+    that must not be filled from a lagging replica'''
+    previous = g.get('db_use_primary')
+    g.db_use_primary = True
+    try:
+        yield
+    finally:
+        g.db_use_primary = previous
+
+
+def _reads_from_primary():
+    '''Returns True if the current request must read from the primary'''
+    if not has_request_context():
+        return True
+
+    return (
+        request.method not in READ_METHODS or
+        g.get('db_use_primary') or
+        g.get('db_wrote') or
+        PRIMARY_COOKIE in request.cookies
+    )
+
+
+class RoutingSession(SignallingSession):
+    '''Session that sends the reads of read-only requests to a replica
+    and everything else to the primary'''
+
+    def get_bind(self, mapper=None, clause=None):
+        replicas = self.app.extensions['replicas']
+
+        # Models bound to a specific bind, flushes and writes, and reads
+        # that must see the client's own writes go to the primary
+        if (not replicas.keys or self._flushing or
+                _reads_from_primary() or (
+                    mapper is not None and
+                    mapper.mapped_table.info.get('bind_key') is not None)):
+            return super(RoutingSession, self).get_bind(mapper, clause)
+
+        engine = replicas.pick(self.app)
+        if engine is None:
+            return super(RoutingSession, self).get_bind(mapper, clause)
+
+        return engine
+
+
+class RoutingSQLAlchemy(PooledSQLAlchemy):
+    '''PooledSQLAlchemy with read replica routing.
+
+        SQLALCHEMY_REPLICA_URIS {Array<string>} replica database uris
+        SQLALCHEMY_REPLICA_MAX_LAG {float} max lag in seconds before a
+            replica stops serving reads
+        SQLALCHEMY_REPLICA_CHECK_INTERVAL {float} seconds between lag checks
+        SQLALCHEMY_PRIMARY_STICKINESS {int} seconds a client keeps reading
+            from the primary after a write
+    '''
+
+    def create_session(self, options):
+        session_factory = orm.sessionmaker(
+            class_=RoutingSession, db=self, **options)
+
+        # Remember writes so the rest of the request and the client's
+        # next reads stay on the primary
+        @event.listens_for(session_factory, 'after_flush')
+        def mark_write(session, flush_context):
+            if has_request_context():
+                g.db_wrote = True
+
+        return session_factory
+
+    def init_app(self, app):
+        replicas = app.extensions['replicas'] = ReplicaSet(self)
+        replicas.init_app(app)
+        super(RoutingSQLAlchemy, self).init_app(app)
+
+        stickiness = app.config.get('SQLALCHEMY_PRIMARY_STICKINESS', 5)
+
+        @app.after_request
+        def set_primary_cookie(response):
+            if replicas.keys and g.get('db_wrote'):
+                response.set_cookie(
+                    PRIMARY_COOKIE, '1', max_age=stickiness, httponly=True)
+            return response
@@ -0,0 +1,306 @@
+from app import db
+from app.models import Project, ProjectTopics
+from flask import current_app
+from collections import defaultdict
+from markupsafe import escape
+from sqlalchemy import func
+from sqlalchemy.orm import selectinload, undefer
+from threading import Lock
+import math
+import re
+
+
+# Weight of a match in each project field
+WEIGHTS = {'title': 4.0, 'topics': 2.0, 'description': 2.0, 'read_me': 1.0}
+
+# Markers wrapped around matched terms in highlights
+START_SEL = '<mark>'
+STOP_SEL = '</mark>'
+
+# Placeholders ts_headline wraps matched terms in, replaced with the
+# markers once the rest of the text is escaped
+PG_START_SEL = '\ue000'
+PG_STOP_SEL = '\ue001'
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def _tokenize(text):
+    '''Splits text into lower case word tokens'''
+    return TOKEN_RE.findall((text or '').lower())
+
+
+def _fields(project):
+    '''Returns the searchable text of each project field'''
+    return {
+        'title': project.title or '',
+        'description': project.description or '',
+        'topics': ' '.join(topic.name or '' for topic in project.topics),
+        'read_me': (project.read_me or b'').decode('utf-8', 'replace'),
+    }
+
+
+def _use_postgres():
+    '''Returns True if the database supports tsvector search'''
+    return db.engine.dialect.name == 'postgresql'
+
+
+class InvertedIndex(object):
+    '''In-memory inverted index from token to weighted term frequency
+    per project, used when the database has no full-text search'''
+
+    def __init__(self):
+        self.postings = defaultdict(dict)
+        self.docs = {}
+        self.loaded = False
+        self._lock = Lock()
+
+    def load(self):
+        '''Indexes every project once, on the first search'''
+        with self._lock:
+            if self.loaded:
+                return
+
+            projects = Project.query.options(
+                undefer('read_me'), selectinload(Project.topics)).all()
+            for project in projects:
+                self._add(project)
+            self.loaded = True
+
+    def _add(self, project):
+        self._remove(project.id)
+
+        weights = defaultdict(float)
+        for field, text in _fields(project).items():
+            for token in _tokenize(text):
+                weights[token] += WEIGHTS[field]
+
+        for token, weight in weights.items():
+            self.postings[token][project.id] = weight
+
+        self.docs[project.id] = {
+            'title': project.title,
+            'description': project.description,
+            'tokens': list(weights),
+        }
+
+    def _remove(self, project_id):
+        doc = self.docs.pop(project_id, None)
+        if not doc:
+            return
+
+        for token in doc['tokens']:
+            postings = self.postings.get(token)
+            if postings is not None:
+                postings.pop(project_id, None)
+                if not postings:
+                    del self.postings[token]
+
+    def invalidate(self):
+        '''Drops the index so it is loaded again on the next search'''
+        with self._lock:
+            self.postings = defaultdict(dict)
+            self.docs = {}
+            self.loaded = False
+
+    def add(self, project):
+        '''Adds or replaces a project in a loaded index'''
+        if self.loaded:
+            with self._lock:
+                self._add(project)
+
+    def remove(self, project_id):
+        '''Removes a project from a loaded index'''
+        if self.loaded:
+            with self._lock:
+                self._remove(project_id)
+
+    def search(self, q, limit):
+        '''Returns the projects containing every query term ranked by
+        tf-idf'''
+        self.load()
+
+        terms = set(_tokenize(q))
+        if not terms:
+            return []
+
+        with self._lock:
+            postings = [self.postings.get(term, {}) for term in terms]
+            if not all(postings):
+                return []
+
+            total = len(self.docs)
+            scores = defaultdict(float)
+            ids = set.intersection(*(set(posting) for posting in postings))
+            for posting in postings:
+                idf = math.log(1 + total / len(posting))
+                for project_id in ids:
+                    scores[project_id] += posting[project_id] * idf
+
+            ranked = sorted(ids, key=lambda id: (-scores[id], id))[:limit]
+
+            return [{
+                'id': project_id,
+                'title': self.docs[project_id]['title'],
+                'rank': round(scores[project_id], 4),
+                'highlight': _highlight(
+                    self.docs[project_id]['description'], terms),
+            } for project_id in ranked]
+
+
+def _highlight(text, terms):
+    '''Escapes text and marks the words matching the query terms'''
+    def mark(match):
+        word = match.group(0)
+        if word.lower() in terms:
+            return START_SEL + word + STOP_SEL
+        return word
+
+    return TOKEN_RE.sub(mark, str(escape(text or '')))
+
+
+# Tables the searchable text of a project is read from
+TABLES = frozenset(['project', 'project_topics', 'topic'])
+
+
+def _index():
+    '''Returns the in-memory index of the current app'''
+    return current_app.extensions['search_index']
+
+
+def _search_vector(project):
+    '''Returns the SQL expression of a project's weighted tsvector'''
+    fields = _fields(project)
+    vector = None
+    for field, weight in (('title', 'A'), ('topics', 'B'),
+                          ('description', 'B'), ('read_me', 'C')):
+        part = func.setweight(
+            func.to_tsvector('english', fields[field]), weight)
+        vector = part if vector is None else vector.op('||')(part)
+
+    return vector
+
+
+def set_search_vector(project):
+    '''Sets the tsvector column of a written project on PostgreSQL, so
+    it must be called before the project is committed
+
+    Arg {Object} project
+    '''
+    if _use_postgres():
+        project.search_vector = _search_vector(project)
+
+
+def index_project(project):
+    '''Adds a project to the in-memory search index once it has been
+    committed, so the index never holds rolled back data
+
+    Arg {Object} project
+    '''
+    if not _use_postgres():
+        _index().add(project)
+
+
+def unindex_project(project_id):
+    '''Removes a deleted project from the search index
+
+    Arg {int} project_id
+    '''
+    if not _use_postgres():
+        _index().remove(project_id)
+
+
+def topic_projects(topic_id):
+    '''Returns the ids of the projects tagged with a topic, whose
+    searchable text changes with it
+
+    Arg {int} topic_id
+
+    Returns {Array<int>} project_ids
+    '''
+    return [row.project_id for row in db.session.query(
+        ProjectTopics.project_id).filter_by(topic_id=topic_id)]
+
+
+def set_search_vectors(project_ids):
+    '''Sets the tsvector columns of projects whose topics were renamed
+    or removed on PostgreSQL, so it must be called before the change is
+    committed
+
+    Arg {Array<int>} project_ids
+    '''
+    if not project_ids or not _use_postgres():
+        return
+
+    db.session.flush()
+    projects = Project.query.options(
+        undefer('read_me'), selectinload(Project.topics)
+    ).filter(Project.id.in_(project_ids)).populate_existing()
+    for project in projects:
+        set_search_vector(project)
+
+
+def index_projects(project_ids):
+    '''Drops the in-memory search index once a change to the topics of
+    projects has been committed, so it is loaded again on the next search
+
+    Arg {Array<int>} project_ids
+    '''
+    if project_ids and not _use_postgres():
+        _index().invalidate()
+
+
+def init_search(app):
+    '''Adds an in-memory search index to the app, dropped after
+    another worker wrote to the projects or their topics
+
+    Arg {Flask} app
+    '''
+    index = app.extensions['search_index'] = InvertedIndex()
+
+    def invalidate(tables):
+        if TABLES & set(tables):
+            index.invalidate()
+
+    app.extensions['bus'].subscribe(invalidate, local=False)
+
+
+def search_projects(q, limit=20):
+    '''Searches project titles, descriptions, topics and READMEs
+
+    Arg {string} q
+        {int} limit
+
+    Returns {Array<Object>} results - id, title, rank, highlight
+    '''
+    if not _use_postgres():
+        return _index().search(q, limit)
+
+    query = func.plainto_tsquery('english', q)
+    rank = func.ts_rank(Project.search_vector, query)
+    highlight = func.ts_headline(
+        'english', func.coalesce(Project.description, ''), query,
+        'StartSel=%s, StopSel=%s' % (PG_START_SEL, PG_STOP_SEL))
+
+    rows = db.session.query(
+        Project.id, Project.title, rank.label('rank'),
+        highlight.label('highlight')
+    ).filter(
+        Project.search_vector.op('@@')(query)
+    ).order_by(
+        rank.desc(), Project.id
+    ).limit(limit).all()
+
+    return [{
+        'id': row.id,
+        'title': row.title,
+        'rank': round(float(row.rank), 4),
+        'highlight': _escape_headline(row.highlight),
+    } for row in rows]
+
+
+def _escape_headline(headline):
+    '''Escapes a ts_headline and marks its matched terms, like
+    _highlight does for the in-memory index'''
+    return str(escape(headline or '')).replace(
+        PG_START_SEL, START_SEL).replace(PG_STOP_SEL, STOP_SEL)
@@ -0,0 +1,196 @@
+from app import db
+from app.models import (User, Role, UserRoles, Team, Match, Bracket,
+    Project, Topic, ProjectTopics)
+from app.utils.readme import readme_hash, render_readme
+from app.utils.bus import mark_written
+from app.utils.tournament import KNOCKOUT_SLOTS, THIRD_PLACE_SLOT
+from werkzeug.security import generate_password_hash
+from datetime import datetime, timedelta
+import csv
+import io
+import random
+import uuid
+
+
+# Password of every seeded user
+PASSWORD = 'benchmark'
+SALT = 'benchmarksalt'
+GROUPS = 'ABCDEFGH'
+CHUNK_SIZE = 10000
+
+
+def _csv_value(value):
+    '''Formats a value for PostgreSQL's CSV COPY format'''
+    if value is None:
+        return '\\N'
+    if isinstance(value, bytes):
+        return '\\x' + value.hex()
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _copy(model, rows):
+    '''Loads rows into a PostgreSQL table with COPY'''
+    quote = db.engine.dialect.identifier_preparer.quote
+    columns = list(rows[0])
+
+    data = io.StringIO()
+    writer = csv.writer(data)
+    for row in rows:
+        writer.writerow([_csv_value(row[column]) for column in columns])
+    data.seek(0)
+
+    cursor = db.session.connection().connection.cursor()
+    cursor.copy_expert(
+        "COPY %s (%s) FROM STDIN WITH (FORMAT csv, NULL '\\N')" % (
+            quote(model.__tablename__),
+            ', '.join(quote(column) for column in columns)),
+        data)
+
+    # Move the id sequence past ids that were set explicitly
+    if 'id' in columns:
+        db.session.execute(
+            "SELECT setval(pg_get_serial_sequence('%s', 'id'), "
+            "(SELECT MAX(id) FROM %s))" % (
+                model.__tablename__, quote(model.__tablename__)))
+
+
+def _insert(model, rows):
+    '''Inserts rows with COPY on PostgreSQL, or in chunks with
+    executemany on other databases'''
+    if not rows:
+        return
+
+    mark_written(model.__tablename__)
+
+    if db.engine.dialect.name == 'postgresql':
+        _copy(model, rows)
+        return
+
+    for start in range(0, len(rows), CHUNK_SIZE):
+        db.session.execute(
+            model.__table__.insert(), rows[start:start + CHUNK_SIZE])
+
+
+def _loser(bracket, slot, teams):
+    '''Returns the team of a knockout match its picked winner beat'''
+    home, away = teams
+    return bracket[away] if bracket[slot] == bracket[home] else bracket[home]
+
+
+def _random_bracket(rng, teams_by_group, uid):
+    '''Returns a random bracket whose picks follow the tournament'''
+    bracket = {'uid': uid}
+    for group in GROUPS:
+        first, second = rng.sample(teams_by_group[group], 2)
+        bracket['grp_%s_1' % group.lower()] = first
+        bracket['grp_%s_2' % group.lower()] = second
+
+    # Each knockout pick is one of the two teams of its match, and the
+    # third place pick one of the teams that lost the semi finals
+    sources = {}
+    for slot, _, home, away in KNOCKOUT_SLOTS:
+        sources[slot] = (home, away)
+        if slot == THIRD_PLACE_SLOT:
+            teams = [_loser(bracket, semi_final, sources[semi_final])
+                     for semi_final in (home, away)]
+        else:
+            teams = (bracket[home], bracket[away])
+        bracket[slot] = rng.choice(teams)
+
+    return bracket
+
+
+def seed(users=100000, projects=20, topics=30, readme_size=20000):
+    '''Creates the tables and fills an empty database with a synthetic
+    tournament. Every user's password is PASSWORD.
+
+    Arg {int} users - number of users, each with a bracket
+        {int} projects
+        {int} topics
+        {int} readme_size - approximate README size in bytes
+    '''
+    # A local generator so seeding doesn't reset the global one
+    rng = random.Random(0)
+    db.create_all()
+
+    _insert(Role, [{'id': 1, 'name': 'admin', 'label': 'Admin'},
+                   {'id': 2, 'name': 'user', 'label': 'User'}])
+
+    # 32 teams in 8 groups of 4
+    team_rows = []
+    teams_by_group = {}
+    for index in range(32):
+        group = GROUPS[index // 4]
+        team_rows.append({
+            'id': index + 1, 'name': 'Team %d' % (index + 1),
+            'iso_2': '%c%c' % (65 + index // 26, 65 + index % 26),
+            'group': group, 'MP': 3, 'W': index % 4, 'D': 0,
+            'L': 3 - index % 4, 'GF': index % 7, 'GA': index % 5,
+            'GD': index % 7 - index % 5, 'Pts': 3 * (index % 4),
+        })
+        teams_by_group.setdefault(group, []).append(index + 1)
+    _insert(Team, team_rows)
+
+    # 48 group matches and 16 knockout matches
+    start = datetime(2018, 6, 14)
+    match_rows = []
+    for number in range(1, 65):
+        if number <= 48:
+            group = GROUPS[(number - 1) // 6]
+            team1, team2 = rng.sample(teams_by_group[group], 2)
+            round, title = 'Group', 'Group %s' % group
+        else:
+            team1, team2 = None, None
+            round, title = 'Knockout', 'Match %d' % number
+        match_rows.append({
+            'match': number, 'team1_id': team1, 'team2_id': team2,
+            'date': start + timedelta(hours=6 * number), 'round': round,
+            'title': title, 'team1_score': rng.randint(0, 3),
+            'team2_score': rng.randint(0, 3),
+        })
+    _insert(Match, match_rows)
+
+    # Users share one precomputed password hash
+    password = generate_password_hash(
+        PASSWORD + SALT, method='pbkdf2:sha512:80000', salt_length=20)
+    now = datetime.utcnow()
+    public_ids = [str(uuid.uuid4()) for _ in range(users)]
+    _insert(User, [{
+        'public_id': public_id, 'name': 'User %d' % index,
+        'email': 'user%d@example.com' % index,
+        'username': 'user%d' % index, 'password': password, 'salt': SALT,
+        'picture': '', 'created_at': now,
+    } for index, public_id in enumerate(public_ids)])
+    _insert(UserRoles, [{
+        'user_id': public_id, 'role_id': 1 if index == 0 else 2,
+    } for index, public_id in enumerate(public_ids)])
+    _insert(Bracket, [
+        _random_bracket(rng, teams_by_group, public_id)
+        for public_id in public_ids])
+
+    # Projects with large READMEs and random topics
+    _insert(Topic, [{
+        'id': index + 1, 'name': 'Topic %d' % index,
+        'profeciency': index % 10,
+    } for index in range(topics)])
+    paragraph = (
+        '## Section\n\nLorem ipsum dolor sit amet, `code` and **bold** '
+        'text with a [link](https://example.com).\n\n')
+    read_me = (paragraph * (readme_size // len(paragraph) + 1)).encode()
+    read_me_html = render_readme(read_me)
+    _insert(Project, [{
+        'id': index + 1, 'title': 'Project %d' % index,
+        'description': 'Benchmark project %d' % index, 'created_at': now,
+        'read_me': read_me, 'read_me_hash': readme_hash(read_me),
+        'read_me_html': read_me_html, 'topic_main': 'Topic 0',
+    } for index in range(projects)])
+    _insert(ProjectTopics, [{
+        'project_id': index + 1, 'topic_id': topic_id,
+    } for index in range(projects)
+        for topic_id in rng.sample(range(1, topics + 1), 5)])
+
+    db.session.commit()
+
+    return public_ids
@@ -0,0 +1,189 @@
+from app import db
+from app.models import Team, Match
+from app.utils.routing import on_primary
+from app.utils.warmup import register_warm_up
+from flask import current_app
+from threading import Lock
+
+
+# Groups in the order they appear on the bracket
+GROUPS = ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H']
+
+# Knockout slots of a bracket, the 2018 match whose winner fills each
+# one, and the slots of the match's two teams. r16_* are the round of
+# 16 winners, r8_* the quarter final winners, r4_* the semi final
+# winners, r2_1 the champion and r2_2 the winner of the third place
+# play-off, which is played by the losers of the semi finals
+KNOCKOUT_SLOTS = [
+    ('r16_1', 49, 'grp_a_1', 'grp_b_2'),
+    ('r16_2', 50, 'grp_c_1', 'grp_d_2'),
+    ('r16_3', 51, 'grp_b_1', 'grp_a_2'),
+    ('r16_4', 52, 'grp_d_1', 'grp_c_2'),
+    ('r16_5', 53, 'grp_e_1', 'grp_f_2'),
+    ('r16_6', 54, 'grp_g_1', 'grp_h_2'),
+    ('r16_7', 55, 'grp_f_1', 'grp_e_2'),
+    ('r16_8', 56, 'grp_h_1', 'grp_g_2'),
+    ('r8_1', 57, 'r16_1', 'r16_2'),
+    ('r8_2', 58, 'r16_5', 'r16_6'),
+    ('r8_3', 59, 'r16_7', 'r16_8'),
+    ('r8_4', 60, 'r16_3', 'r16_4'),
+    ('r4_1', 61, 'r8_1', 'r8_2'),
+    ('r4_2', 62, 'r8_3', 'r8_4'),
+    ('r2_1', 64, 'r4_1', 'r4_2'),
+    ('r2_2', 63, 'r4_1', 'r4_2'),
+]
+
+# Slot whose losers play the third place play-off
+THIRD_PLACE_SLOT = 'r2_2'
+
+# Tables the tournament state is computed from
+TABLES = frozenset(['team', 'match'])
+
+
+def _load_state():
+    '''Loads the columns the tournament state depends on from the
+    primary, since the result is kept until the next write
+
+    Returns {tuple} teams
+            {tuple} matches
+    '''
+    with on_primary():
+        teams = tuple(db.session.query(
+            Team.id, Team.name, Team.iso_2, Team.group, Team.MP, Team.W,
+            Team.D, Team.L, Team.GF, Team.GA, Team.GD, Team.Pts
+        ).order_by(Team.id).all())
+
+        matches = tuple(db.session.query(
+            Match.match, Match.team1_id, Match.team2_id,
+            Match.team1_score, Match.team2_score
+        ).order_by(Match.match).all())
+
+    return teams, matches
+
+
+def _standing_key(team):
+    '''Sort key applying the Pts, GD, GF tiebreakers'''
+    return (-(team.Pts or 0), -(team.GD or 0), -(team.GF or 0), team.name)
+
+
+def _match_winner(match):
+    '''Returns the id of the winning team of a match, or None if the
+    match has no teams yet or has not been decided
+
+    Arg {tuple} match
+    '''
+    if not match or not match.team1_id or not match.team2_id:
+        return None
+
+    team1_score = match.team1_score or 0
+    team2_score = match.team2_score or 0
+
+    if team1_score > team2_score:
+        return match.team1_id
+    if team2_score > team1_score:
+        return match.team2_id
+
+    return None
+
+
+def _resolve(teams, matches):
+    '''Computes the group tables and the resolved bracket slots
+
+    Arg {tuple} teams
+        {tuple} matches
+
+    Returns {Object} groups
+                     bracket
+    '''
+    groups = {}
+    for team in teams:
+        groups.setdefault(team.group, []).append(team)
+
+    tables = {}
+    bracket = {}
+    for group in GROUPS:
+        table = sorted(groups.get(group, []), key=_standing_key)
+        tables[group] = [team._asdict() for team in table]
+
+        # Only fill the group slots once every team has played all of
+        # its group matches
+        complete = len(table) >= 2 and all(
+            (team.MP or 0) >= len(table) - 1 for team in table)
+        prefix = 'grp_%s_' % group.lower()
+        bracket[prefix + '1'] = table[0].id if complete else None
+        bracket[prefix + '2'] = table[1].id if complete else None
+
+    # Fill the knockout slots from the knockout match results
+    by_number = {match.match: match for match in matches}
+    for slot, number, _, _ in KNOCKOUT_SLOTS:
+        bracket[slot] = _match_winner(by_number.get(number))
+
+    return {
+        'groups': tables,
+        'bracket': bracket,
+    }
+
+
+class TournamentState(object):
+    '''Memoized tournament state of an app. A commit in any worker
+    that writes to the teams or matches bumps the version and the state
+    is recomputed on its next use, so unchanged requests don't query at
+    all.'''
+
+    def __init__(self):
+        self.version = 0
+        self._memo = (None, None)
+        self._lock = Lock()
+
+    def get(self):
+        '''Returns the group tables and the resolved bracket
+
+        Returns {Object} state
+        '''
+        version = self.version
+
+        # The version and its value are swapped in together, so a
+        # reader never gets the value of another version
+        loaded, value = self._memo
+        if loaded == version:
+            return value
+
+        value = _resolve(*_load_state())
+
+        # Keep the result only if no write was committed during the load
+        with self._lock:
+            if self.version == version:
+                self._memo = (version, value)
+
+        return value
+
+    def invalidate(self, tables):
+        '''Bumps the version after a commit wrote to the teams or
+        matches
+
+        Arg {Array<string>} tables
+        '''
+        if TABLES & set(tables):
+            with self._lock:
+                self.version += 1
+
+
+def init_tournament(app):
+    '''Adds a tournament state memo to the app, loaded on warm up and
+    invalidated by the app's invalidation bus
+
+    Arg {Flask} app
+    '''
+    state = app.extensions['tournament'] = TournamentState()
+    app.extensions['bus'].subscribe(state.invalidate)
+    register_warm_up(app, state.get)
+
+
+def get_tournament_state():
+    '''Returns the group tables and the actual bracket of the
+    tournament of the current app
+
+    Returns {Object} groups - {Object<Array>} group tables by group
+                     bracket - {Object} team id for each bracket slot
+    '''
+    return current_app.extensions['tournament'].get()
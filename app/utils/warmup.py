@@ -0,0 +1,85 @@
+from app import db, ma
+from jinja2 import TemplateError
+from sqlalchemy.orm import configure_mappers
+from sqlalchemy.exc import SQLAlchemyError
+import gc
+
+
+def _schema_classes(cls):
+    '''Returns every subclass of a schema class, recursively'''
+    for subclass in cls.__subclasses__():
+        yield subclass
+        for child in _schema_classes(subclass):
+            yield child
+
+
+def _is_template(name):
+    '''Returns True for index.html and the html and text templates
+    outside of the client build's static folder'''
+    return name == 'index.html' or (
+        not name.startswith('static/') and name.endswith(('.html', '.txt')))
+
+
+def warm_up(app):
+    '''Does the work every worker would otherwise do on its first
+    requests, so it can run once before the server forks and the
+    results are shared by the workers' copy-on-write pages.
+
+    Arg {Flask} app
+    '''
+    with app.app_context():
+        # Configure the SQLAlchemy mappers
+        configure_mappers()
+
+        # Build every schema and resolve its nested schemas
+        for schema_class in set(_schema_classes(ma.ModelSchema)):
+            schema = schema_class(many=True)
+            schema.dump([])
+            for field in schema.fields.values():
+                if hasattr(field, 'schema'):
+                    field.schema
+
+        # Compile index.html and the email templates. The template
+        # folder is the client build, so skip its images and bundles
+        for name in app.jinja_env.list_templates(filter_func=_is_template):
+            try:
+                app.jinja_env.get_template(name)
+            except (TemplateError, UnicodeDecodeError):
+                app.logger.warning(
+                    'Could not compile template %s.', name, exc_info=True)
+
+        # Load the reference data caches
+        try:
+            for warm in app.extensions.get('warm_up', []):
+                warm()
+
+        # Workers will load the data themselves if the database
+        # isn't available yet
+        except SQLAlchemyError:
+            app.logger.warning('Could not load reference data on warm up.')
+
+        # Don't share database connections with the forked workers
+        db.session.remove()
+        for engine in _engines(app):
+            engine.dispose()
+
+    # Keep the garbage collector from touching, and so copying, the
+    # objects created so far
+    gc.collect()
+    if hasattr(gc, 'freeze'):
+        gc.freeze()
+
+
+def _engines(app):
+    '''Returns the engines of the app's default database and binds'''
+    binds = [None] + list(app.config.get('SQLALCHEMY_BINDS') or ())
+    return [db.get_engine(app, bind=bind) for bind in binds]
+
+
+def register_warm_up(app, func):
+    '''Registers a function that loads data during warm_up
+
+    Arg {Flask} app
+        {func} func
+    '''
+    app.extensions.setdefault('warm_up', []).append(func)
@@ -0,0 +1,11 @@
+#!/usr/bin/env python
+"""ASGI entry point, e.g. `uvicorn asgi:application`
+
+The contact, email and live endpoints run as coroutines, everything
+else runs through the Flask app in a thread pool.
+"""
+from app import create_app
+from app.utils.asgi import AsyncApp
+
+
+application = AsyncApp(create_app())
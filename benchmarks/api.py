@@ -0,0 +1,191 @@
+#!/usr/bin/env python
+"""Benchmarks the hot API endpoints against a seeded database.
+
+Every endpoint is driven through the Flask test client, then through a
+threaded WSGI server with concurrent HTTP clients. Throughput, p50/p99
+latency and SQL queries per request are reported per endpoint.
+
+Usage: python benchmarks/api.py [--users N] [--projects N]
+           [--requests N] [--threads N] [--json FILE]
+
+The database is a temporary SQLite file unless BENCH_DATABASE_URI is
+set. A PostgreSQL database given there must be empty.
+"""
+import argparse
+import base64
+import http.client
+import json
+import os
+import sys
+import tempfile
+from threading import Thread
+from time import perf_counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import create_app, db  # noqa
+from app.utils.queries import count_queries  # noqa
+from werkzeug.serving import make_server  # noqa
+from app.utils.seed import seed, PASSWORD  # noqa
+
+
+def percentile(values, fraction):
+    '''Returns the value at the given fraction of the sorted values'''
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def report(name, latencies, elapsed, queries=None):
+    '''Returns the stats of one benchmarked endpoint'''
+    return {
+        'endpoint': name,
+        'requests': len(latencies),
+        'throughput': len(latencies) / elapsed,
+        'p50_ms': percentile(latencies, 0.5) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'queries': queries,
+    }
+
+
+def endpoints(bracket_id):
+    '''Returns the benchmarked requests as (name, method, path, auth)'''
+    return [
+        ('login', 'GET', '/api/v1/login', True),
+        ('bracket list', 'GET', '/api/v1/bracket', False),
+        ('bracket', 'GET', '/api/v1/bracket/%d' % bracket_id, False),
+        ('match list', 'GET', '/api/v1/match', False),
+        ('user list', 'GET', '/api/v1/user', False),
+        ('token', 'GET', '/token/refresh', False),
+        ('token refresh', 'POST', '/token/refresh', False),
+        ('project list', 'GET', '/api/v1/project', False),
+    ]
+
+
+def bench_test_client(app, requests, basic_auth):
+    '''Drives every endpoint sequentially through the test client'''
+    results = []
+    client = app.test_client()
+
+    # Log in once so the refresh cookies are set
+    response = client.get('/api/v1/login', headers=basic_auth)
+    csrf_refresh = response.headers.get('refresh', '')
+
+    for name, method, path, auth in endpoints(1):
+        headers = dict(basic_auth) if auth else {}
+        if method == 'POST':
+            headers['X-CSRF-TOKEN'] = csrf_refresh
+
+        # List endpoints over all users are slow, so run them less
+        count = max(1, requests // 10) if 'list' in name else requests
+        latencies = []
+        with count_queries() as counter:
+            start = perf_counter()
+            for _ in range(count):
+                request_start = perf_counter()
+                client.open(path, method=method, headers=headers)
+                latencies.append(perf_counter() - request_start)
+            elapsed = perf_counter() - start
+
+        results.append(report(
+            name, latencies, elapsed, counter['count'] / count))
+
+    return results
+
+
+def bench_wsgi(app, requests, threads, basic_auth):
+    '''Drives every GET endpoint concurrently through a threaded WSGI
+    server'''
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    port = server.server_port
+    Thread(target=server.serve_forever, daemon=True).start()
+
+    results = []
+    for name, method, path, auth in endpoints(1):
+        if method != 'GET':
+            continue
+
+        headers = dict(basic_auth) if auth else {}
+        count = max(1, requests // 10) if 'list' in name else requests
+        per_thread = max(1, count // threads)
+        latencies = []
+
+        def worker():
+            connection = http.client.HTTPConnection('127.0.0.1', port)
+            for _ in range(per_thread):
+                request_start = perf_counter()
+                connection.request(method, path, headers=headers)
+                connection.getresponse().read()
+                latencies.append(perf_counter() - request_start)
+            connection.close()
+
+        workers = [Thread(target=worker) for _ in range(threads)]
+        start = perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        elapsed = perf_counter() - start
+
+        results.append(report(name, latencies, elapsed))
+
+    server.shutdown()
+    return results
+
+
+def print_results(title, results):
+    print(title)
+    print('%-16s %8s %10s %10s %10s %8s' % (
+        'endpoint', 'requests', 'req/s', 'p50 ms', 'p99 ms', 'queries'))
+    for result in results:
+        queries = result['queries']
+        print('%-16s %8d %10.1f %10.2f %10.2f %8s' % (
+            result['endpoint'], result['requests'], result['throughput'],
+            result['p50_ms'], result['p99_ms'],
+            '-' if queries is None else '%.1f' % queries))
+    print('')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--users', type=int, default=100000)
+    parser.add_argument('--projects', type=int, default=20)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--json', help='also write the results to FILE')
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    app = create_app(TESTING=True, SQLALCHEMY_DATABASE_URI=os.environ.get(
+        'BENCH_DATABASE_URI',
+        'sqlite:///%s' % os.path.join(directory, 'benchmark.db')))
+
+    with app.app_context():
+        start = perf_counter()
+        seed(users=args.users, projects=args.projects)
+        print('seeded %d users in %.1fs\n' % (
+            args.users, perf_counter() - start))
+
+    credentials = base64.b64encode(
+        ('user0:%s' % PASSWORD).encode()).decode()
+    basic_auth = {'Authorization': 'Basic %s' % credentials}
+
+    client_results = bench_test_client(app, args.requests, basic_auth)
+    print_results('Flask test client', client_results)
+
+    wsgi_results = bench_wsgi(app, args.requests, args.threads, basic_auth)
+    print_results('WSGI server, %d threads' % args.threads, wsgi_results)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({
+                'test_client': client_results,
+                'wsgi': wsgi_results,
+            }, f, indent=2)
+
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+"""Compares the threaded WSGI server with the ASGI app under open
+live-score streams.
+
+K clients hold /api/v1/live open while concurrent clients request
+/api/v1/match. Match latency and throughput are reported for the
+threaded werkzeug server and for uvicorn running app.utils.asgi.
+
+Usage: python benchmarks/asgi.py [--streams K] [--requests N]
+           [--threads N] [--json FILE]
+
+The database is a temporary SQLite file unless BENCH_DATABASE_URI is
+set. A PostgreSQL database given there must be empty.
+"""
+import argparse
+import http.client
+import json
+import os
+import socket
+import sys
+import tempfile
+from threading import Thread
+from time import perf_counter, sleep
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import create_app, db  # noqa
+from app.utils.asgi import AsyncApp  # noqa
+from app.utils.seed import seed  # noqa
+from werkzeug.serving import make_server  # noqa
+from api import report, print_results  # noqa
+import uvicorn  # noqa
+
+
+def free_port():
+    '''Returns a free local port'''
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def serve_wsgi(app):
+    '''Starts a threaded WSGI server and returns (port, stop)'''
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    Thread(target=server.serve_forever, daemon=True).start()
+    return server.server_port, server.shutdown
+
+
+def serve_asgi(app):
+    '''Starts uvicorn with the ASGI app and returns (port, stop)'''
+    port = free_port()
+    config = uvicorn.Config(
+        AsyncApp(app), host='127.0.0.1', port=port, log_level='warning',
+        lifespan='on')
+    server = uvicorn.Server(config)
+    # Signal handlers can only be installed on the main thread
+    server.install_signal_handlers = lambda: None
+    Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        sleep(0.05)
+
+    def stop():
+        server.should_exit = True
+
+    return port, stop
+
+
+def open_streams(port, count):
+    '''Opens count live streams and returns their connections once
+    every stream has received its first event'''
+    connections = []
+    for _ in range(count):
+        connection = http.client.HTTPConnection('127.0.0.1', port)
+        connection.request('GET', '/api/v1/live')
+        response = connection.getresponse()
+        response.fp.readline()
+        connections.append(connection)
+    return connections
+
+
+def bench(port, requests, threads):
+    '''Requests /api/v1/match concurrently and returns the stats'''
+    per_thread = max(1, requests // threads)
+    latencies = []
+
+    def worker():
+        connection = http.client.HTTPConnection('127.0.0.1', port)
+        for _ in range(per_thread):
+            request_start = perf_counter()
+            connection.request('GET', '/api/v1/match')
+            connection.getresponse().read()
+            latencies.append(perf_counter() - request_start)
+        connection.close()
+
+    workers = [Thread(target=worker) for _ in range(threads)]
+    start = perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = perf_counter() - start
+
+    return report('match list', latencies, elapsed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--streams', type=int, default=50)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--json', help='also write the results to FILE')
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    app = create_app(
+        TESTING=True, LIVE_POLL_INTERVAL=1,
+        SQLALCHEMY_DATABASE_URI=os.environ.get(
+            'BENCH_DATABASE_URI',
+            'sqlite:///%s' % os.path.join(directory, 'benchmark.db')))
+
+    with app.app_context():
+        seed(users=100, projects=5)
+
+    results = {}
+    for name, serve in (('wsgi', serve_wsgi), ('asgi', serve_asgi)):
+        port, stop = serve(app)
+        streams = open_streams(port, args.streams)
+        result = bench(port, args.requests, args.threads)
+        results[name] = result
+        print_results('%s, %d open streams' % (
+            name.upper(), args.streams), [result])
+
+        for connection in streams:
+            connection.close()
+        stop()
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+"""Benchmarks the list endpoints under each json encoder.
+
+For every encoder the serialized user, project and bracket lists are
+encoded on their own, then the endpoints are requested through the
+Flask test client. Encode time, throughput and p50/p99 latency are
+reported per endpoint.
+
+Usage: python benchmarks/json_encoders.py [--users N] [--projects N]
+           [--requests N] [--json FILE]
+
+The database is a temporary SQLite file unless BENCH_DATABASE_URI is
+set. A PostgreSQL database given there must be empty.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+from time import perf_counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import create_app, db  # noqa
+from app.models import (User, UserSchema, Project, ProjectSchema,  # noqa
+    Bracket, BracketSchema)
+from app.utils.encoders import ENCODERS, orjson  # noqa
+from app.utils.seed import seed  # noqa
+from flask import json as flask_json  # noqa
+from api import report, print_results  # noqa
+
+
+# List endpoints and the schema output each one encodes
+ENDPOINTS = [
+    ('user list', '/api/v1/user', User, UserSchema),
+    ('project list', '/api/v1/project', Project, ProjectSchema),
+    ('bracket list', '/api/v1/bracket', Bracket, BracketSchema),
+]
+
+
+def bench_encode(app, requests):
+    '''Encodes each endpoint's schema output and returns the stats'''
+    results = []
+    with app.app_context():
+        for name, path, model, schema in ENDPOINTS:
+            output = schema(many=True).dump(model.query.all()).data
+            count = max(1, requests // 10)
+            latencies = []
+            start = perf_counter()
+            for _ in range(count):
+                encode_start = perf_counter()
+                flask_json.dumps(output)
+                latencies.append(perf_counter() - encode_start)
+            elapsed = perf_counter() - start
+            results.append(report(name, latencies, elapsed))
+        db.session.remove()
+    return results
+
+
+def bench_requests(app, requests):
+    '''Requests each endpoint through the test client'''
+    results = []
+    client = app.test_client()
+    for name, path, model, schema in ENDPOINTS:
+        count = max(1, requests // 10)
+        latencies = []
+        start = perf_counter()
+        for _ in range(count):
+            request_start = perf_counter()
+            client.get(path)
+            latencies.append(perf_counter() - request_start)
+        elapsed = perf_counter() - start
+        results.append(report(name, latencies, elapsed))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--projects', type=int, default=20)
+    parser.add_argument('--requests', type=int, default=100)
+    parser.add_argument('--json', help='also write the results to FILE')
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    uri = os.environ.get(
+        'BENCH_DATABASE_URI',
+        'sqlite:///%s' % os.path.join(directory, 'benchmark.db'))
+
+    backends = [name for name in ENCODERS
+                if name != 'orjson' or orjson is not None]
+    if orjson is None:
+        print('orjson is not installed, only benchmarking the stdlib\n')
+
+    results = {}
+    for backend in backends:
+        app = create_app(
+            TESTING=True, SQLALCHEMY_DATABASE_URI=uri, JSON_BACKEND=backend,
+            COMPRESS_ENABLED=False)
+
+        if not results:
+            with app.app_context():
+                seed(users=args.users, projects=args.projects)
+
+        encode_results = bench_encode(app, args.requests)
+        request_results = bench_requests(app, args.requests)
+        print_results('%s, encode only' % backend, encode_results)
+        print_results('%s, test client' % backend, request_results)
+        results[backend] = {
+            'encode': encode_results,
+            'requests': request_results,
+        }
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+"""Runs concurrent queries against the configured database and reports
+throughput and connection pool stats.
+
+Usage: python benchmarks/pool_load.py [threads] [queries_per_thread]
+"""
+import os
+import sys
+from threading import Thread
+from time import perf_counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import create_app, db  # noqa
+from app.models import Team  # noqa
+from app.utils.pool import get_pool_stats  # noqa
+
+app = create_app()
+
+
+def worker(queries):
+    '''Runs a query in a new session the given number of times'''
+    with app.app_context():
+        for _ in range(queries):
+            Team.query.first()
+            db.session.remove()
+
+
+def main():
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    workers = [Thread(target=worker, args=(queries,))
+               for _ in range(threads)]
+
+    start = perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = perf_counter() - start
+
+    total = threads * queries
+    print('threads: %d, queries: %d' % (threads, total))
+    print('elapsed: %.2fs, throughput: %.0f queries/s' % (
+        elapsed, total / elapsed))
+
+    with app.app_context():
+        for key, value in sorted(get_pool_stats(db.engine).items()):
+            print('%s: %s' % (key, value))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+"""Measures the time to import the app package and create an app, and
+lists the slowest imports reported by `python -X importtime`.
+
+Usage: python benchmarks/startup.py [--runs N] [--top N] [--compare REF]
+
+--compare runs the same measurement on a git worktree of REF, e.g. the
+commit before the application factory, to compare before and after.
+Older trees create the app on import, so their create time is zero.
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Imports the package and creates an app, printing both times
+SCRIPT = '''
+from time import perf_counter
+start = perf_counter()
+import app
+imported = perf_counter()
+if hasattr(app, 'create_app'):
+    app.create_app()
+created = perf_counter()
+print('%f %f' % (imported - start, created - imported))
+'''
+
+
+def measure(root, runs):
+    '''Returns the best import and create times over runs'''
+    times = []
+    for _ in range(runs):
+        output = subprocess.check_output(
+            [sys.executable, '-c', SCRIPT], cwd=root)
+        times.append(tuple(float(value) for value in output.split()))
+
+    return min(times)
+
+
+def slowest_imports(root, top):
+    '''Returns the top imports by cumulative time in microseconds'''
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import app'],
+        cwd=root, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+        universal_newlines=True, check=True)
+
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # Only list top level packages
+        if not name.startswith('   '):
+            imports.append((int(cumulative), name.strip()))
+
+    return sorted(imports, reverse=True)[:top]
+
+
+def report(title, root, runs, top):
+    import_time, create_time = measure(root, runs)
+    print(title)
+    print('import app: %.1fms, create_app(): %.1fms' % (
+        import_time * 1000, create_time * 1000))
+    for cumulative, name in slowest_imports(root, top):
+        print('%10.1fms  %s' % (cumulative / 1000, name))
+    print('')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--compare', metavar='REF')
+    args = parser.parse_args()
+
+    if args.compare:
+        worktree = tempfile.mkdtemp()
+        subprocess.check_call(
+            ['git', 'worktree', 'add', '--detach', worktree, args.compare],
+            cwd=ROOT)
+        # Use the same config module as this tree
+        if os.path.exists(os.path.join(ROOT, 'config.py')):
+            shutil.copy(os.path.join(ROOT, 'config.py'), worktree)
+        try:
+            report(args.compare, worktree, args.runs, args.top)
+        finally:
+            subprocess.check_call(
+                ['git', 'worktree', 'remove', '--force', worktree], cwd=ROOT)
+
+    report('working tree', ROOT, args.runs, args.top)
+
+
+if __name__ == '__main__':
+    main()
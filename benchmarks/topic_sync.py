@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+"""Times syncing the topics of a project with many topics against an
+in-memory SQLite database (or BENCH_DATABASE_URI).
+
+Usage: python benchmarks/topic_sync.py [topics] [edits]
+"""
+import os
+import random
+import sys
+from time import perf_counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import create_app, db  # noqa
+from app.models import Project, Topic, ProjectTopics  # noqa
+from app.utils.queries import count_queries  # noqa
+
+
+def main():
+    topics = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    edits = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+
+    app = create_app(SQLALCHEMY_DATABASE_URI=os.environ.get(
+        'BENCH_DATABASE_URI', 'sqlite://'))
+
+    with app.app_context():
+        db.create_all()
+
+        db.session.add_all([
+            Topic(name='topic %d' % index, profeciency=index % 10)
+            for index in range(topics)
+        ])
+        project = Project(title='benchmark', description='benchmark')
+        db.session.add(project)
+        db.session.commit()
+
+        topic_ids = [topic.id for topic in Topic.query.all()]
+        project_id = project.id
+
+        # Replace a random half of the topics on every edit
+        random.seed(0)
+        with count_queries() as counter:
+            start = perf_counter()
+            for _ in range(edits):
+                ProjectTopics.sync(
+                    project_id, random.sample(topic_ids, topics // 2))
+                db.session.commit()
+            elapsed = perf_counter() - start
+
+        print('topics: %d, edits: %d' % (topics, edits))
+        print('elapsed: %.3fs, %.2fms per edit' % (
+            elapsed, elapsed / edits * 1000))
+        print('queries per edit: %.1f' % (counter['count'] / edits))
+
+        db.drop_all()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,12 @@
 #!/usr/bin/env python
-from app import db
+from app import create_app, db
+from flask_migrate import stamp
 
-# Create db tables from sqlalchemy models
-db.create_all()
+app = create_app()
+
+# Create db tables from sqlalchemy models and mark the database as
+# up to date with the migrations. Existing databases are upgraded with
+# `flask db upgrade` instead.
+with app.app_context():
+    db.create_all()
+    stamp()
@@ -0,0 +1,16 @@
+# Load and warm up the app in the master so the workers share its
+# memory and don't start cold
+preload_app = True
+
+
+def post_fork(server, worker):
+    # Each worker opens its own database connections
+    from app import db
+    from wsgi import app
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+    # Listen for invalidations before the first request. The caches
+    # inherited from the master are dropped once the listener is up
+    app.extensions['bus'].start()
@@ -0,0 +1,157 @@
+"""Baseline schema created by createdb.py
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 09:00:00.000000
+
+Creates the schema the models had before migrations existed, so
+`flask db upgrade` builds an empty database. Databases created with
+db.create_all() before migrations existed already have it, and should
+be stamped with this revision and then upgraded:
+
+    flask db stamp 0001
+    flask db upgrade
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy_utils import JSONType
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# Group and knockout picks of a bracket
+GROUP_SLOTS = ['grp_%s_%d' % (group, place)
+               for group in 'abcdefgh' for place in (1, 2)]
+KNOCKOUT_SLOTS = (
+    ['r16_%d' % index for index in range(1, 9)] +
+    ['r8_%d' % index for index in range(1, 5)] +
+    ['r4_1', 'r4_2', 'r2_1', 'r2_2'])
+
+
+def upgrade():
+    op.create_table(
+        'user',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('public_id', sa.String(50), nullable=False),
+        sa.Column('name', sa.String(32), server_default=''),
+        sa.Column('email', sa.String(32), nullable=False),
+        sa.Column('username', sa.String(32), nullable=True),
+        sa.Column('password', sa.String(255), nullable=True),
+        sa.Column('salt', sa.String(32), nullable=True),
+        sa.Column('picture', sa.String(150), server_default=''),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('public_id'))
+    op.create_index('ix_user_email', 'user', ['email'], unique=True)
+    op.create_index('ix_user_username', 'user', ['username'])
+
+    op.create_table(
+        'role',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(50), nullable=True),
+        sa.Column('label', sa.Unicode(255), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('name'))
+
+    op.create_table(
+        'user_roles',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.String(), nullable=True),
+        sa.Column('role_id', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(
+            ['user_id'], ['user.public_id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['role_id'], ['role.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'))
+
+    op.create_table(
+        'oauth',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('provider', sa.String(50), nullable=True),
+        sa.Column('token', JSONType(), nullable=True),
+        sa.Column('provider_uid', sa.String(120), nullable=False),
+        sa.Column('uid', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['uid'], ['user.public_id']),
+        sa.PrimaryKeyConstraint('id'))
+
+    op.create_table(
+        'bracket',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('uid', sa.String(), nullable=True),
+        *([sa.Column(slot, sa.Integer(), nullable=False)
+           for slot in GROUP_SLOTS] +
+          [sa.Column(slot, sa.Integer(), nullable=True)
+           for slot in KNOCKOUT_SLOTS] +
+          [sa.ForeignKeyConstraint(['uid'], ['user.public_id']),
+           sa.PrimaryKeyConstraint('id')]))
+    op.create_index('ix_bracket_uid', 'bracket', ['uid'], unique=True)
+
+    op.create_table(
+        'team',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(40), nullable=False),
+        sa.Column('iso_2', sa.CHAR(2), nullable=False),
+        sa.Column('group', sa.CHAR(1), nullable=False),
+        *([sa.Column(column, sa.Integer(), nullable=True)
+           for column in ('MP', 'W', 'D', 'L', 'GF', 'GA', 'GD', 'Pts')] +
+          [sa.PrimaryKeyConstraint('id'), sa.UniqueConstraint('name')]))
+
+    op.create_table(
+        'match',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('match', sa.Integer(), nullable=False),
+        sa.Column('team1_id', sa.Integer(), nullable=True),
+        sa.Column('team2_id', sa.Integer(), nullable=True),
+        sa.Column('date', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('round', sa.String(32), nullable=False),
+        sa.Column('title', sa.String(32), nullable=False),
+        sa.Column('team1_score', sa.Integer(), nullable=True),
+        sa.Column('team2_score', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['team1_id'], ['team.id']),
+        sa.ForeignKeyConstraint(['team2_id'], ['team.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('match'))
+
+    op.create_table(
+        'project',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('img_url', sa.String(96), server_default=''),
+        sa.Column('site_url', sa.String(96), server_default=''),
+        sa.Column('github_url', sa.String(96), server_default=''),
+        sa.Column('alt', sa.String(32), server_default='project'),
+        sa.Column('title', sa.String(48), nullable=False),
+        sa.Column('description', sa.String(256), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('read_me', sa.LargeBinary(), server_default=''),
+        sa.Column('topic_main', sa.String(32), server_default=''),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('title'))
+
+    op.create_table(
+        'topic',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(48), nullable=True),
+        sa.Column('profeciency', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('name'))
+
+    op.create_table(
+        'project_topics',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('project_id', sa.Integer(), nullable=True),
+        sa.Column('topic_id', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(
+            ['project_id'], ['project.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(
+            ['topic_id'], ['topic.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'))
+
+
+def downgrade():
+    for table in ('project_topics', 'topic', 'project', 'match', 'team',
+                  'bracket', 'oauth', 'user_roles', 'role', 'user'):
+        op.drop_table(table)
@@ -0,0 +1,135 @@
+"""Cached README html, full-text search and unique project topics
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 09:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+from app.utils.readme import readme_hash, render_readme
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+# Search vector of an existing project, weighted like app.utils.search.
+# The README is bound as text decoded in Python, since convert_from
+# fails on bytes that aren't valid UTF-8
+SEARCH_VECTOR = sa.text(
+    "UPDATE project SET search_vector = "
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(("
+    "SELECT string_agg(topic.name, ' ') FROM topic "
+    "JOIN project_topics ON project_topics.topic_id = topic.id "
+    "WHERE project_topics.project_id = project.id), '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B') "
+    "|| setweight(to_tsvector('english', :read_me), 'C') "
+    "WHERE id = :id")
+
+# Number of READMEs rendered per query
+BATCH_SIZE = 500
+
+project = sa.table(
+    'project',
+    sa.column('id', sa.Integer),
+    sa.column('read_me', sa.LargeBinary),
+    sa.column('read_me_hash', sa.String),
+    sa.column('read_me_html', sa.Text),
+)
+
+
+def render_readmes(bind, postgres):
+    '''Stores the hash and the rendered html of every existing README,
+    so the README route never has to write them, and fills the search
+    vectors on PostgreSQL'''
+    last = 0
+    while True:
+        rows = bind.execute(
+            sa.select([project.c.id, project.c.read_me])
+            .where(project.c.id > last)
+            .order_by(project.c.id)
+            .limit(BATCH_SIZE)).fetchall()
+        if not rows:
+            return
+
+        for row in rows:
+            bind.execute(
+                project.update()
+                .where(project.c.id == row.id)
+                .values(read_me_hash=readme_hash(row.read_me),
+                        read_me_html=render_readme(row.read_me)))
+
+            # Fill the search vector too, without the NUL characters
+            # PostgreSQL text can't hold
+            if postgres:
+                read_me = (row.read_me or b'').decode('utf-8', 'replace')
+                bind.execute(
+                    SEARCH_VECTOR, id=row.id,
+                    read_me=read_me.replace('\x00', ''))
+        last = rows[-1].id
+
+
+def upgrade():
+    postgres = op.get_bind().dialect.name == 'postgresql'
+
+    op.add_column(
+        'project', sa.Column('read_me_hash', sa.String(64), nullable=True))
+    op.add_column(
+        'project', sa.Column('read_me_html', sa.Text(), nullable=True))
+    op.add_column('project', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR() if postgres else sa.Text(),
+        nullable=True))
+
+    render_readmes(op.get_bind(), postgres)
+
+    # Remove duplicate project topics before making them unique
+    op.execute(
+        'DELETE FROM project_topics WHERE id NOT IN ('
+        'SELECT MIN(id) FROM project_topics '
+        'GROUP BY project_id, topic_id)')
+
+    if not postgres:
+        with op.batch_alter_table('project_topics') as batch_op:
+            batch_op.create_unique_constraint(
+                'uq_project_topics_project_topic', ['project_id', 'topic_id'])
+        op.create_index(
+            'ix_project_topics_topic_project', 'project_topics',
+            ['topic_id', 'project_id'])
+        op.create_index(
+            'ix_project_search_vector', 'project', ['search_vector'])
+        return
+
+    # Build the indexes without locking the tables against writes
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'uq_project_topics_project_topic', 'project_topics',
+            ['project_id', 'topic_id'], unique=True,
+            postgresql_concurrently=True)
+        op.execute(
+            'ALTER TABLE project_topics ADD CONSTRAINT '
+            'uq_project_topics_project_topic UNIQUE USING INDEX '
+            'uq_project_topics_project_topic')
+        op.create_index(
+            'ix_project_topics_topic_project', 'project_topics',
+            ['topic_id', 'project_id'], postgresql_concurrently=True)
+        op.create_index(
+            'ix_project_search_vector', 'project', ['search_vector'],
+            postgresql_using='gin', postgresql_concurrently=True)
+
+
+def downgrade():
+    op.drop_index('ix_project_search_vector', 'project')
+    op.drop_index('ix_project_topics_topic_project', 'project_topics')
+    with op.batch_alter_table('project_topics') as batch_op:
+        batch_op.drop_constraint(
+            'uq_project_topics_project_topic', type_='unique')
+    with op.batch_alter_table('project') as batch_op:
+        batch_op.drop_column('search_vector')
+        batch_op.drop_column('read_me_html')
+        batch_op.drop_column('read_me_hash')
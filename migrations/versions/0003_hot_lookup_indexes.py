@@ -0,0 +1,59 @@
+"""Indexes for hot lookup columns
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 09:20:00.000000
+
+project_topics.project_id is already covered by the leading column of
+uq_project_topics_project_topic from 0002.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_oauth_provider_provider_uid', 'oauth',
+        ['provider', 'provider_uid'], True),
+    ('ix_user_roles_user_id', 'user_roles', ['user_id'], False),
+    ('ix_match_round', 'match', ['round'], False),
+    ('ix_team_group', 'team', ['group'], False),
+]
+
+
+def upgrade():
+    postgres = op.get_bind().dialect.name == 'postgresql'
+
+    # Keep only the oldest link of each provider account, which the
+    # login used, before making the links unique. Links without a
+    # provider stay, since the index allows several of them
+    op.execute(
+        'DELETE FROM oauth WHERE provider IS NOT NULL AND id NOT IN ('
+        'SELECT MIN(id) FROM oauth WHERE provider IS NOT NULL '
+        'GROUP BY provider, provider_uid)')
+
+    # Build the indexes concurrently on PostgreSQL so the tables
+    # aren't locked against writes
+    for name, table, columns, unique in INDEXES:
+        if postgres:
+            with op.get_context().autocommit_block():
+                op.create_index(
+                    name, table, columns, unique=unique,
+                    postgresql_concurrently=True)
+        else:
+            op.create_index(name, table, columns, unique=unique)
+
+
+def downgrade():
+    postgres = op.get_bind().dialect.name == 'postgresql'
+
+    for name, table, columns, unique in reversed(INDEXES):
+        if postgres:
+            with op.get_context().autocommit_block():
+                op.drop_index(name, table, postgresql_concurrently=True)
+        else:
+            op.drop_index(name, table)
@@ -0,0 +1,25 @@
+#!/usr/bin/env python
+"""Fills an empty database with a synthetic tournament for capacity
+testing.
+
+Usage: python seeddb.py [--users N] [--projects N] [--topics N]
+"""
+import argparse
+from time import perf_counter
+from app import create_app
+from app.utils.seed import seed
+
+
+parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+parser.add_argument('--users', type=int, default=100000)
+parser.add_argument('--projects', type=int, default=20)
+parser.add_argument('--topics', type=int, default=30)
+args = parser.parse_args()
+
+app = create_app()
+
+# Create db tables and bulk load the data
+with app.app_context():
+    start = perf_counter()
+    seed(users=args.users, projects=args.projects, topics=args.topics)
+    print('Seeded %d users in %.1fs' % (args.users, perf_counter() - start))
@@ -0,0 +1,79 @@
+from app import db
+from app.models import User, Role, Bracket, Team, Match, Project, Topic
+from app.utils.queries import count_queries, assert_max_queries
+from datetime import datetime
+import pytest
+
+
+GROUP_SLOTS = ['grp_%s_%d' % (group, place)
+               for group in 'abcdefgh' for place in (1, 2)]
+
+
+def add_users(count):
+    '''Adds users with a role and a bracket'''
+    role = Role.query.filter_by(name='user').first() or \
+        Role(name='user', label='User')
+    for _ in range(count):
+        user = User(name='User', picture='', password='', salt='')
+        user.generate_public_id()
+        user.email = user.username = user.public_id[:32]
+        user.roles.append(role)
+        user.bracket = Bracket(**{slot: 1 for slot in GROUP_SLOTS})
+        db.session.add(user)
+
+
+def add_projects(count):
+    '''Adds projects with two topics'''
+    topics = Topic.query.all() or [
+        Topic(name='Topic %d' % index, profeciency=index)
+        for index in range(2)]
+    start = Project.query.count()
+    for index in range(start, start + count):
+        project = Project(
+            title='Project %d' % index, description='Project')
+        project.topics.extend(topics)
+        db.session.add(project)
+
+
+def add_matches(count):
+    '''Adds matches between two teams'''
+    start = Team.query.count()
+    for index in range(start, start + count):
+        team1 = Team(name='Team %d' % index, iso_2='AA', group='A')
+        team2 = Team(name='Team %d b' % index, iso_2='BB', group='A')
+        db.session.add(Match(
+            match=index + 1, team1=team1, team2=team2,
+            date=datetime(2018, 6, 14), round='Group', title='Group A'))
+
+
+def get(client, path):
+    '''Requests path with an empty identity map, so relationships
+    loaded by an earlier request aren't reused'''
+    db.session.remove()
+    response = client.get(path)
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize('path, add_rows', [
+    ('/api/v1/user', add_users),
+    ('/api/v1/bracket', add_users),
+    ('/api/v1/project', add_projects),
+    ('/api/v1/match', add_matches),
+])
+def test_list_queries_dont_grow_with_rows(client, path, add_rows):
+    add_rows(1)
+    db.session.commit()
+
+    # The first request after a commit loads the cached reference data
+    get(client, path)
+    with count_queries() as single:
+        get(client, path)
+
+    add_rows(20)
+    db.session.commit()
+
+    # A query per row would exceed the count of a single row
+    get(client, path)
+    with assert_max_queries(single['count']) as many:
+        get(client, path)
+    assert many['count'] == single['count']
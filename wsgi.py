@@ -0,0 +1,11 @@
+#!/usr/bin/env python
+"""WSGI entry point, e.g. `gunicorn wsgi:app`"""
+from app import create_app
+from app.utils.warmup import warm_up
+
+
+app = create_app()
+
+# Warm the app up once before the server forks its workers
+if app.config.get('WARM_UP', True):
+    warm_up(app)